@@ -0,0 +1,319 @@
+"""ygt-build: compile ygt sources into hinted fonts from the command line.
+
+This is for batch and CI use. It does not import PyQt6 (nor anything that
+does), so it runs on servers without a display. Each source is read,
+checked with the same validators the editor uses, compiled, and written to
+the output font named in its "font" section.
+
+    ygt-build Elstob.yaml
+    ygt-build -j 4 fonts/*.yaml
+    ygt-build --check fonts/*.yaml
+
+Several sources can be built at once in a pool of worker processes (-j).
+When only one source is built, its glyphs are compiled in parallel instead
+(see ygCompiler.export_font).
+"""
+
+from typing import Optional, Tuple
+import os
+import sys
+import time
+import pathlib
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import yaml
+from fontTools import ufoLib  # type: ignore
+from .fontBuffer import fontBuffer
+from .ufoCache import ygUFOCache
+from .ygCore import obsolete_hint_types
+from .ygSchema import (
+    is_valid,
+    is_cvt_valid,
+    is_prep_valid,
+    are_functions_valid,
+    are_macros_valid,
+    are_defaults_valid,
+    are_names_valid,
+    are_properties_valid,
+    error_message,
+)
+
+# Sections of the source checked before anything is compiled, with their
+# validators.
+SECTION_VALIDATORS = {
+    "cvt": is_cvt_valid,
+    "prep": is_prep_valid,
+    "functions": are_functions_valid,
+    "macros": are_macros_valid,
+    "defaults": are_defaults_valid,
+}
+
+
+class buildError(Exception):
+    pass
+
+
+def _point_index(p):
+    if type(p) is str:
+        try:
+            return int(p)
+        except ValueError:
+            pass
+    return p
+
+
+def _normalized(obj):
+    """Returns a copy of (part of) a source as the editor would see it once
+    loaded, for validating: obsolete hint types (which xgridfit accepts but
+    the validators don't) are changed to "stem", and point indices written
+    as strings become ints.
+    """
+    if isinstance(obj, dict):
+        r = {k: _normalized(v) for k, v in obj.items()}
+        if r.get("rel") in obsolete_hint_types:
+            r["rel"] = "stem"
+        for k in ["ptid", "ref"]:
+            if k in r:
+                if type(r[k]) is list:
+                    r[k] = [_point_index(p) for p in r[k]]
+                else:
+                    r[k] = _point_index(r[k])
+        return r
+    if isinstance(obj, list):
+        return [
+            "stem" if x in obsolete_hint_types else _normalized(x) for x in obj
+        ]
+    return obj
+
+
+def load_source(filename: str) -> dict:
+    """Reads a ygt source: a .yaml file or a UFO with the source stored in
+    its data directory.
+    """
+    suff = pathlib.Path(filename).suffix
+    if suff == ".yaml":
+        with open(filename, "r") as f:
+            doc = yaml.safe_load(f)
+    elif suff == ".ufo":
+        ufo = ufoLib.UFOReader(filename)
+        doc = None
+        # The editor has written the source under both of these names.
+        for d in ["org.ygthinting/source.yaml", "org.ygthinter/source.yaml"]:
+            try:
+                doc = yaml.safe_load(ufo.readData(d))
+                break
+            except Exception:
+                pass
+        ufo.close()
+        if doc == None:
+            raise buildError("No ygt source in " + filename)
+    else:
+        raise buildError("Not a ygt source: " + filename)
+    if not isinstance(doc, dict):
+        raise buildError("Malformed ygt source: " + filename)
+    return doc
+
+
+def validate_source(source: dict) -> list:
+    """Checks the source with the validators in ygSchema. Returns a list of
+    error messages (empty if the source is valid).
+    """
+    errors = []
+    source = _normalized(source)
+    if not "font" in source or not source["font"].get("in"):
+        errors.append("The source does not name an input font")
+    for section, validator in SECTION_VALIDATORS.items():
+        if section in source and source[section] != None:
+            if not validator(source[section]):
+                errors.append(error_message())
+    glyphs = source.get("glyphs")
+    if glyphs == None:
+        return errors
+    for gname, gsource in glyphs.items():
+        if gsource == None:
+            continue
+        for axis in ["y", "x"]:
+            if axis in gsource and gsource[axis] != None:
+                if not is_valid(gsource[axis]):
+                    errors.append(gname + ": " + error_message())
+        if "names" in gsource and not are_names_valid(gsource["names"]):
+            errors.append(gname + ": " + error_message())
+        if "props" in gsource and not are_properties_valid(gsource["props"]):
+            errors.append(gname + ": " + error_message())
+    return errors
+
+
+def load_font(filename: str) -> fontBuffer:
+    """Reads the font to be hinted (a .ttf, or a UFO, which is compiled the
+    same way the editor does it, and cached in the same place).
+    """
+    suff = pathlib.Path(filename).suffix
+    if suff == ".ttf":
+        return fontBuffer(filename)
+    if suff == ".ufo":
+        return ygUFOCache().load(filename)
+    raise buildError("Can't read font " + filename)
+
+
+def build_source(
+    filename: str,
+    output_font: Optional[str] = None,
+    workers: Optional[int] = None,
+    incremental: bool = True,
+    check_only: bool = False,
+) -> Tuple[bool, list]:
+    """Validates and (unless check_only is True) compiles one source.
+    Returns a tuple: whether the build succeeded, and a list of messages.
+
+    Font names in the source are relative to the source's directory, as in
+    the editor. output_font overrides the output font named in the source.
+    """
+    messages: list = []
+    try:
+        source = load_source(filename)
+    except Exception as e:
+        return False, [str(e)]
+    errors = validate_source(source)
+    if len(errors) > 0:
+        return False, errors
+    if check_only:
+        return True, messages
+
+    d = os.path.dirname(os.path.abspath(filename))
+    in_font = os.path.join(d, source["font"]["in"])
+    if output_font == None:
+        output_font = source["font"].get("out")
+        if not output_font:
+            return False, ["The source does not name an output font"]
+        output_font = os.path.join(d, output_font)
+    try:
+        font = load_font(in_font)
+    except Exception as e:
+        return False, ["Can't load font " + in_font + ": " + str(e)]
+
+    defaults = source.get("defaults") or {}
+    mergemode = bool(defaults.get("merge-mode"))
+    try:
+        if mergemode or output_font.endswith(".ufo"):
+            from xgridfit import run as xgf_run  # type: ignore
+
+            try:
+                functionbase = int(defaults.get("function-base"))
+            except TypeError:
+                functionbase = 0
+            assume_y = "no"
+            if defaults.get("assume-always-y"):
+                assume_y = "yes"
+            err, failed = xgf_run(
+                font=font.copy(),
+                yaml=source,
+                outputfont=output_font,
+                quiet=3,
+                mergemode=mergemode,
+                replaceprep=bool(defaults.get("replace-prep")),
+                functionbase=functionbase,
+                initgraphics=bool(defaults.get("init-graphics")),
+                assume_y=assume_y,
+            )
+        else:
+            from .ygCompiler import export_font
+
+            failed = export_font(
+                font, source, output_font, workers=workers, incremental=incremental
+            )
+    except Exception as e:
+        return False, ["Failed to generate the font: " + str(e)]
+    if failed:
+        messages.append("Failed to compile one or more glyphs: " + " ".join(failed))
+    messages.append("Wrote " + output_font)
+    return not failed, messages
+
+
+def _build_job(args: tuple) -> Tuple[bool, list]:
+    return build_source(*args)
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="ygt-build",
+        description="Compile ygt sources (.yaml or .ufo) into hinted fonts.",
+    )
+    parser.add_argument("sources", nargs="+", help="ygt sources to build")
+    parser.add_argument(
+        "-o", "--output", help="output font (only when building one source)"
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of sources to build at once (default 1)",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=None,
+        help="worker processes for compiling one source's glyphs (default: "
+        + "one per CPU when building one source at a time, else 1)",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="validate the sources without compiling them",
+    )
+    parser.add_argument(
+        "--no-incremental",
+        action="store_true",
+        help="compile every glyph, ignoring any build manifest",
+    )
+    parser.add_argument("-q", "--quiet", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.output and len(args.sources) > 1:
+        parser.error("--output can only be used with a single source")
+    jobs = max(1, min(args.jobs, len(args.sources)))
+    workers = args.workers
+    if workers == None and jobs > 1:
+        workers = 1
+    job_args = [
+        (s, args.output, workers, not args.no_incremental, args.check)
+        for s in args.sources
+    ]
+
+    start = time.perf_counter()
+    if jobs == 1:
+        results = map(_build_job, job_args)
+    else:
+        executor = ProcessPoolExecutor(
+            max_workers=jobs, mp_context=multiprocessing.get_context("spawn")
+        )
+        results = executor.map(_build_job, job_args)
+    failures = 0
+    for s, (ok, messages) in zip(args.sources, results):
+        if not ok:
+            failures += 1
+        if not args.quiet or not ok:
+            for m in messages:
+                print(s + ": " + m, file=sys.stderr if not ok else sys.stdout)
+            if ok and args.check:
+                print(s + ": OK")
+    if jobs > 1:
+        executor.shutdown()
+    if not args.quiet:
+        print(
+            ("Checked " if args.check else "Built ")
+            + str(len(args.sources) - failures)
+            + " of "
+            + str(len(args.sources))
+            + " sources in "
+            + str(round(time.perf_counter() - start, 2))
+            + " s"
+        )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,194 @@
+from typing import Union, Optional, Any
+import io
+import os
+import mmap
+import ctypes
+from tempfile import SpooledTemporaryFile
+from fontTools import ttLib  # type: ignore
+
+
+class _mappedReader(io.RawIOBase):
+    """A read-only, seekable stream over a memory map. Each reader has its
+    own position, so any number of them (in any number of threads) can
+    read the same map.
+    """
+
+    def __init__(self, data: mmap.mmap, name: str) -> None:
+        super().__init__()
+        self.data = data
+        # fontTools checks this, so as not to save a lazily loaded font
+        # over the file it is reading.
+        self.name = name
+        self.pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.pos
+
+    def seek(self, pos: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            pos += self.pos
+        elif whence == io.SEEK_END:
+            pos += len(self.data)
+        self.pos = max(0, pos)
+        return self.pos
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        if size == None or size < 0:
+            size = len(self.data) - self.pos
+        b = self.data[self.pos : self.pos + size]
+        self.pos += len(b)
+        return b
+
+    def readinto(self, b: Any) -> int:
+        d = self.read(len(b))
+        b[: len(d)] = d
+        return len(d)
+
+
+class _memoryStream:
+    """Hands a buffer to freetype-py, which reads a font "stream" with a
+    single read() and passes the result straight to FT_New_Memory_Face.
+    """
+
+    def __init__(self, buf: Any) -> None:
+        self.buf = buf
+
+    def read(self) -> Any:
+        return self.buf
+
+
+class fontBuffer:
+    """An immutable copy of a font's binary data, from which any number of
+    independent fontTools TTFont objects can be made cheaply.
+
+    This replaces copy.deepcopy(TTFont) for the preview and export threads.
+    A TTFont made by copy() shares the buffer: fontTools decompiles a table
+    only when it is accessed, and writes untouched tables straight from
+    the buffer when the font is saved. So compiling a font materializes
+    only the tables that xgridfit actually changes (glyf, fpgm, prep, cvt,
+    cvar, maxp, head), and every copy starts from the font as it was when
+    the buffer was made, whatever has happened to the editor's TTFont
+    since (the editor scales glyph coordinates in place, for instance).
+
+    The same buffer is read by FreeType (freetypeFont) and HarfBuzz
+    (harfbuzzFont), so that the editor keeps one copy of the font in memory
+    rather than one for each library.
+
+    A font file is read into memory. It can be memory-mapped instead, but
+    only if nothing will rewrite it in place while it is mapped: when a
+    mapped file is truncated, the next access to the map kills the
+    process (SIGBUS). So only files that ygt owns and replaces atomically,
+    like the entries in the UFO cache, should be mapped.
+
+    Parameters:
+
+    font: the name of a font file, an open (binary) file, bytes, or a
+    fontTools TTFont (which is saved into the buffer).
+
+    map_file: if font is the name of a file, map it rather than reading it.
+
+    Attributes:
+
+    data: the font, as bytes or (for a mapped file) an mmap.
+
+    path: the name of the mapped file, or None.
+    """
+
+    def __init__(
+        self,
+        font: Union[str, bytes, SpooledTemporaryFile, ttLib.TTFont],
+        map_file: bool = False,
+    ) -> None:
+        self.path: Optional[str] = None
+        self._c_buffer: Any = None
+        if isinstance(font, ttLib.TTFont):
+            f = io.BytesIO()
+            font.save(f, 1)
+            self.data: Union[bytes, mmap.mmap] = f.getvalue()
+        elif isinstance(font, (bytes, bytearray)):
+            self.data = bytes(font)
+        elif isinstance(font, str):
+            if map_file:
+                self.data = self._map(font)
+            else:
+                with open(font, "rb") as f:
+                    self.data = f.read()
+        else:
+            font.seek(0)
+            self.data = font.read()
+            font.seek(0)
+
+    def _map(self, filename: str) -> Union[bytes, mmap.mmap]:
+        with open(filename, "rb") as f:
+            try:
+                # A private (copy-on-write) map, because ctypes will only
+                # make a pointer to a writable buffer (see c_buffer). We
+                # never write to it, so the pages stay shared with the
+                # file.
+                m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+            except (ValueError, OSError):
+                # An empty file, or a file system that can't be mapped.
+                return f.read()
+        self.path = os.path.abspath(filename)
+        return m
+
+    @property
+    def mapped(self) -> bool:
+        return isinstance(self.data, mmap.mmap)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def reader(self) -> io.RawIOBase:
+        """Returns a new read-only stream over the buffer."""
+        if isinstance(self.data, mmap.mmap):
+            return _mappedReader(self.data, str(self.path))
+        # A BytesIO made from a bytes object shares that object's memory
+        # until something writes to it, which nothing here does.
+        r = io.BytesIO(self.data)
+        # A lazily loaded TTFont checks its stream's name before saving, so
+        # as not to overwrite the file it is reading. This one reads only
+        # memory, so it may be saved anywhere.
+        r.name = None
+        return r
+
+    def copy(self, **kwargs) -> ttLib.TTFont:
+        """Returns a new TTFont backed by this buffer. kwargs are passed to
+        the TTFont constructor.
+        """
+        # Unless lazy is True, TTFont reads the whole stream into a
+        # BytesIO of its own, which would be a copy of the buffer.
+        kwargs.setdefault("lazy", True)
+        return ttLib.TTFont(self.reader(), **kwargs)
+
+    def tobytes(self) -> bytes:
+        """Returns the font as bytes (for a mapped file, a copy), e.g. to
+        send it to another process.
+        """
+        if isinstance(self.data, mmap.mmap):
+            return self.data[:]
+        return self.data
+
+    def c_buffer(self) -> Any:
+        """Returns the buffer in a form ctypes can pass as a pointer: the
+        bytes object itself, or an array over the map.
+        """
+        if isinstance(self.data, mmap.mmap):
+            if self._c_buffer == None:
+                self._c_buffer = (ctypes.c_ubyte * len(self.data)).from_buffer(
+                    self.data
+                )
+            return self._c_buffer
+        return self.data
+
+    def stream(self) -> _memoryStream:
+        """Returns the buffer wrapped for freetype.Face, which makes a face
+        from it without copying it.
+        """
+        return _memoryStream(self.c_buffer())
@@ -1,23 +1,44 @@
-# from typing import Any, TypeVar, Union, Optional, List, Callable, overload, Iterable
-from .freetypeFont import RENDER_LCD_1, RENDER_GRAYSCALE
+from typing import Optional, Tuple
+import threading
+from .freetypeFont import freetypeFont, RENDER_LCD_1, RENDER_GRAYSCALE
 from .ygModel import ygFont
-from .ygLabel import ygLabel
+from .ygCompiler import ygProgramCache
+from .fontBuffer import fontBuffer
+from .ygPreviewBuilder import ygPreviewScheduler
 from math import ceil
+from collections import OrderedDict, deque
 
 # import copy
-from PyQt6.QtCore import Qt, pyqtSignal, pyqtSlot, QRect
+from PyQt6.QtCore import (
+    Qt,
+    pyqtSignal,
+    pyqtSlot,
+    QRect,
+    QObject,
+    QThread,
+    QCoreApplication,
+    QEvent,
+)
 from PyQt6.QtWidgets import (
     QWidget,
-    QGridLayout,
     QVBoxLayout,
     QScrollArea,
     QHBoxLayout,
     QLabel,
     QLineEdit,
     QPushButton,
+    QCheckBox,
+    QSpinBox,
 )
 
-from PyQt6.QtGui import QPainter, QColor, QPalette, QPixmap, QPen, QGuiApplication
+from PyQt6.QtGui import (
+    QPainter,
+    QColor,
+    QPalette,
+    QImage,
+    QPen,
+    QGuiApplication,
+)
 
 
 FONT_VIEW_DARK_COMPOSITE = QColor(64, 42, 9)
@@ -28,6 +49,247 @@ FONT_VIEW_HINTED = QColor(186, 255, 255, 128)
 FONT_VIEW_UNHINTED = QColor("white")
 FONT_VIEW_HIGHLIGHT = QColor(255, 0, 0, 128)
 
+# Cells are square, at least this many pixels on a side, in rows this many
+# cells wide.
+FONT_VIEW_CELL_SIZE = 36
+FONT_VIEW_COLUMNS = 10
+
+# Size of the glyphs in the cells (ppem): the default and the range offered
+# for inspecting hinting.
+FONT_VIEW_SIZE = 24
+FONT_VIEW_MIN_SIZE = 8
+FONT_VIEW_MAX_SIZE = 72
+
+
+def cell_size_for(ppem: int) -> int:
+    return max(FONT_VIEW_CELL_SIZE, round(ppem * 1.5))
+
+
+# FreeType faces all belong to one FT_Library, and it is not safe to make
+# or free faces in different threads at the same time.
+_face_lock = threading.Lock()
+
+
+def _release_faces(faces: list) -> None:
+    with _face_lock:
+        for f in faces:
+            f.close()
+
+
+def cell_fill_color(dark_theme: bool, is_composite: bool, has_hints: bool) -> QColor:
+    if dark_theme:
+        if is_composite:
+            return FONT_VIEW_DARK_COMPOSITE
+        elif has_hints:
+            return FONT_VIEW_DARK_HINTED
+        return FONT_VIEW_DARK_UNHINTED
+    if is_composite:
+        return FONT_VIEW_COMPOSITE
+    elif has_hints:
+        return FONT_VIEW_HINTED
+    return FONT_VIEW_UNHINTED
+
+
+def render_thumbnail(face: freetypeFont, job: dict) -> QImage:
+    """Draws the cell for a glyph on a QImage (which, unlike a QPixmap,
+    can be made in any thread).
+
+    job is a dict with "gname", "size" (ppem), "cell_size", "dark_theme",
+    "is_composite", "has_hints" and "is_current".
+    """
+    cell_size = job["cell_size"]
+    img = QImage(cell_size, cell_size, QImage.Format.Format_ARGB32_Premultiplied)
+    img.fill(cell_fill_color(job["dark_theme"], job["is_composite"], job["has_hints"]))
+
+    painter = QPainter(img)
+
+    if job["is_current"]:
+        highlight_color = FONT_VIEW_HIGHLIGHT
+        r = QRect(1, 1, cell_size - 2, cell_size - 2)
+        qp = QPen(highlight_color)
+        qp.setWidth(2)
+        painter.setPen(qp)
+        painter.drawRect(r)
+
+    if face.size != job["size"]:
+        face.set_size(job["size"])
+    ind = face.name_to_index(job["gname"].encode(encoding="utf-8"))
+    face.set_render_mode(RENDER_LCD_1)
+    face.set_char(ind)
+    baseline = round((cell_size - face.face_height) / 2) + face.ascender
+    xpos = round((cell_size - face.advance) / 2)
+    face.draw_char(painter, xpos, baseline, dark_theme=job["dark_theme"])
+    face.reset_rect_list()
+
+    painter.end()
+    return img
+
+
+def _job_key(job: dict) -> tuple:
+    return (job["gname"], job["size"], job["has_hints"], job["is_current"])
+
+
+class ygThumbnailWorker(QThread):
+    """Renders thumbnails from the queue of a ygThumbnailPool until the
+    queue is empty, then finishes.
+    """
+
+    sig_thumbnail_ready = pyqtSignal(object)
+
+    def __init__(self, pool: "ygThumbnailPool") -> None:
+        super().__init__()
+        self.pool = pool
+
+    def run(self) -> None:
+        face, generation = self.pool._take_face()
+        try:
+            while not self.isInterruptionRequested():
+                job = self.pool._next_job(self)
+                if job == None:
+                    break
+                if generation != self.pool.generation:
+                    # The pool has a new font.
+                    _release_faces([face])
+                    face, generation = self.pool._take_face()
+                try:
+                    img = render_thumbnail(face, job)
+                except Exception as e:
+                    print("Error rendering thumbnail for " + job["gname"] + ":")
+                    print(e)
+                    img = None
+                self.pool._job_done(job)
+                if img != None:
+                    self.sig_thumbnail_ready.emit(
+                        {"job": job, "image": img, "generation": generation}
+                    )
+        finally:
+            if not self.pool._return_face(face, generation):
+                _release_faces([face])
+            self.pool._worker_done(self)
+
+
+class ygThumbnailPool(QObject):
+    """Renders font view thumbnails in background threads, so that the
+    GUI never waits for FreeType.
+
+    Each worker thread has its own FreeType face, made from font (a
+    fontBuffer, which the faces share); faces are kept for reuse by later
+    workers, and freed (under _face_lock) when the font changes. Workers
+    are started as needed, up to max_threads, and finish when there is
+    nothing left to render.
+
+    request() replaces the queue with a new list of jobs (see
+    render_thumbnail), in the order in which they should be done: callers
+    pass the cells now in view, so that cells scrolled past are dropped.
+    Jobs already being rendered are not queued again. Finished thumbnails
+    are sent with sig_thumbnail_ready, in a dict with "job", "image" and
+    "generation".
+
+    set_font() replaces the font. generation counts the fonts the pool
+    has had; a thumbnail whose generation is not the pool's current one was
+    rendered from an old font.
+    """
+
+    sig_thumbnail_ready = pyqtSignal(object)
+
+    def __init__(
+        self, font: fontBuffer, max_threads: Optional[int] = None, parent=None
+    ) -> None:
+        super().__init__(parent=parent)
+        self.font = font
+        self.generation = 0
+        if max_threads == None:
+            max_threads = min(4, max(1, QThread.idealThreadCount()))
+        self.max_threads = max_threads
+        self.lock = threading.Lock()
+        self.queue: deque = deque()
+        self.in_flight: set = set()
+        self.workers: list = []
+        self.faces: list = []
+        self.rendered_count = 0
+        app = QCoreApplication.instance()
+        if app != None:
+            app.aboutToQuit.connect(self.stop)
+
+    def request(self, jobs: list) -> None:
+        with self.lock:
+            self.queue = deque(j for j in jobs if not _job_key(j) in self.in_flight)
+            new_workers = []
+            while len(self.workers) < min(self.max_threads, len(self.queue)):
+                w = ygThumbnailWorker(self)
+                w.sig_thumbnail_ready.connect(self.sig_thumbnail_ready)
+                w.finished.connect(w.deleteLater)
+                self.workers.append(w)
+                new_workers.append(w)
+        for w in new_workers:
+            w.start()
+
+    def stop(self) -> None:
+        """Drops the queue and waits for the workers to finish."""
+        with self.lock:
+            self.queue.clear()
+            workers = list(self.workers)
+        for w in workers:
+            w.requestInterruption()
+        for w in workers:
+            w.wait()
+        with self.lock:
+            faces = self.faces
+            self.faces = []
+        _release_faces(faces)
+
+    def set_font(self, font: fontBuffer) -> None:
+        with self.lock:
+            self.font = font
+            self.generation += 1
+            faces = self.faces
+            self.faces = []
+        _release_faces(faces)
+
+    def _take_face(self) -> Tuple[freetypeFont, int]:
+        with self.lock:
+            if len(self.faces):
+                return self.faces.pop(), self.generation
+            font = self.font
+            generation = self.generation
+        with _face_lock:
+            face = freetypeFont(font, size=FONT_VIEW_SIZE)
+        return face, generation
+
+    def _return_face(self, face: freetypeFont, generation: int) -> bool:
+        """Keeps face for reuse, unless it is for an old font. Returns
+        whether it was kept.
+        """
+        with self.lock:
+            if generation == self.generation:
+                self.faces.append(face)
+                return True
+        return False
+
+    def _next_job(self, worker: ygThumbnailWorker) -> Optional[dict]:
+        with self.lock:
+            if len(self.queue) == 0:
+                # The worker is finishing. Take it out of the pool now, not
+                # when it is done, so that request() will start another
+                # if new jobs arrive in the meantime.
+                if worker in self.workers:
+                    self.workers.remove(worker)
+                return None
+            job = self.queue.popleft()
+            self.in_flight.add(_job_key(job))
+            return job
+
+    def _job_done(self, job: dict) -> None:
+        with self.lock:
+            self.in_flight.discard(_job_key(job))
+            self.rendered_count += 1
+
+    def _worker_done(self, worker: ygThumbnailWorker) -> None:
+        with self.lock:
+            if worker in self.workers:
+                self.workers.remove(worker)
+
+
 # The font view is now a window, not a dialog. "Dialog" is retained in the
 # file name to avoid obscuring the history in the repository.
 
@@ -48,7 +310,13 @@ class fontViewWindow(QWidget):
     Glyphs in the font view are painted with Freetype rather than using system
     facilities. The Freetype font is the one already loaded by the ygFont object
     for the current window. The font view may employ hints already in the font, but
-    it will not show the current hinting of the font.
+    it will not show the current hinting of the font--unless "Hinted" is checked.
+    Then the glyphs are drawn from a hinted build of the whole font, at the
+    size (ppem) chosen beside the checkbox, for looking over the hinting of the
+    whole font without exporting it. The build is kept up to date in the
+    background: when hints change, it is rebuilt (edits made in quick
+    succession are batched), recompiling only the glyphs that have changed, and
+    only the cells of glyphs whose programs have changed are redrawn.
     """
 
     sig_switch_to_glyph = pyqtSignal(object)
@@ -63,9 +331,21 @@ class fontViewWindow(QWidget):
         self.search_panel.addWidget(QLabel("Filter:"))
         self.search_editor = QLineEdit()
         self.search_editor.setClearButtonEnabled(True)
+        self.search_editor.setToolTip(
+            "Part of a glyph name, U+0041, cat:Lu, hinted:yes, composite:no,\n"
+            + "comp:acutecomb; terms separated by spaces must all match"
+        )
         self.search_panel.addWidget(self.search_editor)
         self.submit_button = QPushButton("Submit")
         self.search_panel.addWidget(self.submit_button)
+        self.hinting_box = QCheckBox("Hinted")
+        self.search_panel.addWidget(self.hinting_box)
+        self.size_box = QSpinBox()
+        self.size_box.setRange(FONT_VIEW_MIN_SIZE, FONT_VIEW_MAX_SIZE)
+        self.size_box.setValue(FONT_VIEW_SIZE)
+        self.size_box.setSuffix(" ppem")
+        self.size_box.setEnabled(False)
+        self.search_panel.addWidget(self.size_box)
 
         # General initializations: state, data.
         self.valid = True
@@ -75,15 +355,28 @@ class fontViewWindow(QWidget):
         # self.glyph_name_list = [g[1] for g in glyph_list]
         self.yg_font = yg_font
         self.face = self.yg_font.freetype_font
-        self.face.set_size(24)
+        self.face.set_size(FONT_VIEW_SIZE)
         if not self.face.valid:
             self.valid = False
             return
+        # Thumbnails are rendered in the background, with their own
+        # FreeType faces.
+        self.thumbnail_pool = ygThumbnailPool(self.yg_font.preview_font, parent=self)
         # glyph_list and current_glyph_list are lists of tuples, with the first member a
-        # Unicode number and the second the name of the glyph. fvc_index is a dict of
-        # fontViewCell objects keyed by glyph name.
+        # Unicode number and the second the name of the glyph.
         self.glyph_list = self.current_glyph_list = glyph_list
-        self.fvc_index = {}
+        self.current_glyph: Optional[str] = None
+        self.size = FONT_VIEW_SIZE
+
+        # For showing the current hinting. The program cache is separate from
+        # the preview's, since each must be used by one thread at a time.
+        # hinted_keys and hinted_font_program_key record what is in the
+        # hinted font the cells are drawn from.
+        self.show_hinting = False
+        self.hinted_cache: Optional[ygProgramCache] = None
+        self.hinted_scheduler = None
+        self.hinted_keys: dict = {}
+        self.hinted_font_program_key: Optional[str] = None
 
         # This requires Qt 6.5 or higher.
         self.dark_theme = (
@@ -106,26 +399,33 @@ class fontViewWindow(QWidget):
         )
         self.submit_button.clicked.connect(self.got_search_term)
         self.search_editor.editingFinished.connect(self.got_search_term)
+        self.hinting_box.toggled.connect(self.set_show_hinting)
+        self.size_box.valueChanged.connect(self.set_size)
 
     def set_glyph_visible(self, g: str) -> None:
         """Scrolls the window so that glyph g is visible."""
-        gc = self.fvc_index[g]
-        self.scroll_area.ensureWidgetVisible(gc, xMargin=0)
+        r = self.fvp.cell_rect(g)
+        if r != None:
+            m = round(self.fvp.cell_size / 2)
+            self.scroll_area.ensureVisible(r.center().x(), r.center().y(), m, m)
 
     def update_cell(self, g, force_redraw: bool = False):
         """Requests an repainting of cell for glyph g.
         force_redraw makes the request more insistent.
         """
-        gc = self.fvc_index[g]
-        gc.make_pixmap(force_redraw=force_redraw)
-        gc.update()
+        self.fvp.update_cell(g, force_redraw=force_redraw)
+        if self.show_hinting and not force_redraw:
+            # Called when g's hints change.
+            self.request_hinted_build()
 
     def set_current_glyph(self, g: str, b: bool) -> None:
         """Sets the current glyph to g. Forces repainting
         of the cell because we need to add a red border.
         """
-        gc = self.fvc_index[g]
-        gc._current_glyph = b
+        if b:
+            self.current_glyph = g
+        elif self.current_glyph == g:
+            self.current_glyph = None
         self.update_cell(g, force_redraw=True)
 
     def clicked_glyph(self, g: str) -> None:
@@ -134,26 +434,128 @@ class fontViewWindow(QWidget):
         """
         self.sig_switch_to_glyph.emit(g)
 
+    @pyqtSlot(bool)
+    def set_show_hinting(self, b: bool) -> None:
+        self.show_hinting = b
+        self.size_box.setEnabled(b)
+        if b:
+            if self.hinted_scheduler == None:
+                self.hinted_cache = ygProgramCache(max_subset_fonts=1)
+                self.hinted_scheduler = ygPreviewScheduler(
+                    delay=500, max_wait=2000, parent=self
+                )
+                self.hinted_scheduler.sig_preview_ready.connect(self.hinted_build_ready)
+            self.request_hinted_build()
+        else:
+            if self.hinted_scheduler != None:
+                self.hinted_scheduler.cancel()
+            self.hinted_keys = {}
+            self.hinted_font_program_key = None
+            self.thumbnail_pool.set_font(self.yg_font.preview_font)
+            self.size_box.setValue(FONT_VIEW_SIZE)
+            self.fvp.clear_thumbnails()
+        self.set_title()
+
+    @pyqtSlot(int)
+    def set_size(self, n: int) -> None:
+        self.size = n
+        self.fvp.set_cell_size(cell_size_for(n))
+        self.set_title()
+
+    def set_title(self) -> None:
+        t = "Font View"
+        if self.show_hinting:
+            t += " — hinted, " + str(self.size) + " ppem"
+        self.setWindowTitle(t)
+
+    def request_hinted_build(self) -> None:
+        """Asks for the hinted font to be brought up to date."""
+        if self.hinted_scheduler == None:
+            return
+        names = [g[1] for g in self.glyph_list]
+        self.hinted_scheduler.request(
+            self.yg_font.preview_font,
+            self.yg_font.source,
+            names,
+            cache=self.hinted_cache,
+            program_list=[g for g in names if self.yg_font.has_hints(g)],
+        )
+
+    @pyqtSlot(object)
+    def hinted_build_ready(self, args: dict) -> None:
+        if not self.show_hinting:
+            return
+        keys = self.hinted_cache.last_keys
+        fp_key = self.hinted_cache.last_font_program_key
+        if fp_key != self.hinted_font_program_key:
+            changed = None
+        else:
+            changed = [
+                g
+                for g in set(keys) | set(self.hinted_keys)
+                if keys.get(g) != self.hinted_keys.get(g)
+            ]
+        self.hinted_keys = dict(keys)
+        self.hinted_font_program_key = fp_key
+        self.thumbnail_pool.set_font(fontBuffer(args["font"]))
+        args["font"].close()
+        if len(args["failed"]):
+            print("Font view: failed to compile " + " ".join(args["failed"]))
+        if changed == None:
+            self.fvp.clear_thumbnails()
+        else:
+            for g in changed:
+                self.fvp.update_cell(g, force_redraw=True)
+
+    def changeEvent(self, event) -> None:
+        # Changes to the cvt, functions and so on don't go through
+        # update_cell: catch them when the user comes back to this window.
+        if event.type() == QEvent.Type.ActivationChange and self.isActiveWindow():
+            if self.show_hinting:
+                self.request_hinted_build()
+        super().changeEvent(event)
+
+    def closeEvent(self, event) -> None:
+        self.thumbnail_pool.stop()
+        if self.hinted_scheduler != None:
+            self.hinted_scheduler.cancel()
+        super().closeEvent(event)
+
     @pyqtSlot()
     def got_search_term(self):
         self.fvp.makeFilteredLayout(self.search_editor.text())
 
 
 class fontViewPanel(QWidget):
-    def __init__(self, dialog: fontViewWindow) -> None:
+    """The grid of glyphs in the font view. It is virtual: there is no
+    widget per glyph. Cells are painted only when they are in view, from
+    thumbnails rendered in the background (by the window's
+    ygThumbnailPool) the first time they are needed and kept in a cache (at
+    most max_thumbnails of them, least recently used dropped first). Until
+    its thumbnail arrives, a cell is painted with just its background color.
+    """
+
+    def __init__(self, dialog: fontViewWindow, max_thumbnails: int = 5000) -> None:
         super().__init__()
         self.dialog = dialog
-        self._layout = QGridLayout()
-        self._layout.setContentsMargins(0, 0, 0, 0)
-        self.makeFreshLayout(self.dialog.current_glyph_list, delete_old=False)
-        self.setContentsMargins(0, 0, 0, 0)
-        self.setLayout(self._layout)
+        self.max_thumbnails = max_thumbnails
+        self.cell_size = FONT_VIEW_CELL_SIZE
+        # Keyed by glyph name. Values are tuples: (QImage, state), where
+        # state is as returned by cell_state(), so that a thumbnail can be
+        # redrawn when the glyph gains or loses hints.
+        self.thumbnails: OrderedDict = OrderedDict()
+        self.glyph_list: list = []
+        # Glyph name -> position in self.glyph_list
+        self.positions: dict = {}
         if dialog.dark_theme:
-            self.setStyleSheet("background-color: black;")
+            self.background_color = QColor("black")
         else:
-            self.setStyleSheet("background-color: white;")
+            self.background_color = QColor("white")
+        self.setContentsMargins(0, 0, 0, 0)
+        self.makeFreshLayout(self.dialog.current_glyph_list)
+        self.dialog.thumbnail_pool.sig_thumbnail_ready.connect(self.thumbnail_ready)
 
-    def makeFreshLayout(self, glyph_list: list, delete_old: bool = True) -> None:
+    def makeFreshLayout(self, glyph_list: list) -> None:
         """Given a list of glyphs, causes those glyphs to be displayed in
         the font window. That is, it filters the font's glyph list to
         reflect a search result.
@@ -161,139 +563,173 @@ class fontViewPanel(QWidget):
         params:
 
         glyph_list: A list of tuples: (Unicode, glyph_name)
-
-        delete_old: whether to delete (or hide, actually) the cells
-        currently displayed in the font view window. Should be false
-        when initializing the window, true when displaying the result
-        of a searchk.
         """
-        # glyph_list has got to be a list of tuples (Unicode, name)
-        if delete_old:
-            while self._layout.count() > 0:
-                i = self._layout.itemAt(0).widget()
-                self._layout.removeWidget(i)
-                i.hide()
-        numchars = len(glyph_list)
-        cols = 10
-        rows = ceil(numchars / 10)
-        self.setMinimumSize(cols * 36, rows * 36)
-        self._layout.setHorizontalSpacing(0)
-        self._layout.setVerticalSpacing(0)
-        row = col = 0
-        self._layout.setRowMinimumHeight(row, 36)
-        for g in glyph_list:
-            gn = g[1]
-            try:
-                fvc = self.dialog.fvc_index[gn]
-            except KeyError:
-                fvc = fontViewCell(self.dialog, g)
-                self.dialog.fvc_index[gn] = fvc
-            self._layout.addWidget(fvc, row, col)
-            if delete_old:
-                fvc.setVisible(True)
-            col += 1
-            if col == 10:
-                row += 1
-                self._layout.setRowMinimumHeight(row, 36)
-                col = 0
+        self.glyph_list = glyph_list
+        self.positions = {g[1]: i for i, g in enumerate(glyph_list)}
+        rows = ceil(len(glyph_list) / FONT_VIEW_COLUMNS)
+        self.setFixedSize(FONT_VIEW_COLUMNS * self.cell_size, rows * self.cell_size)
+        self.update()
 
     def makeFilteredLayout(self, s: str) -> None:
-        """Given a string, this searches the font's glyph list and passes
+        """Given a query, this searches the font's glyph list and passes
         the result to makeFreshLayout, which rebuilds the display of
-        glyphs. If the string is empty, it displays the whole font.
+        glyphs. If the query is empty, it displays the whole font.
 
         param:
 
-        s: the string to search for.
+        s: the query (see ygSearch for the syntax).
         """
-        if len(s):
-            search_result = [i for i in self.dialog.glyph_list if s in i[1]]
+        if len(s.strip()):
+            search_result = self.dialog.yg_font.search_index.search(s)
         else:
             search_result = self.dialog.glyph_list
         self.makeFreshLayout(search_result)
         if len(s) and len(search_result):
-            self.dialog.scroll_area.ensureWidgetVisible(
-                self._layout.itemAt(0).widget(), xMargin=0
-            )
-
+            self.dialog.scroll_area.ensureVisible(0, 0)
+
+    def set_cell_size(self, n: int) -> None:
+        self.cell_size = n
+        self.thumbnails.clear()
+        self.makeFreshLayout(self.glyph_list)
+
+    def clear_thumbnails(self) -> None:
+        self.thumbnails.clear()
+        self.update()
+
+    def cell_rect(self, g: str) -> Optional[QRect]:
+        """The rectangle occupied by glyph g, or None if it is not shown."""
+        i = self.positions.get(g)
+        if i == None:
+            return None
+        return QRect(
+            (i % FONT_VIEW_COLUMNS) * self.cell_size,
+            (i // FONT_VIEW_COLUMNS) * self.cell_size,
+            self.cell_size,
+            self.cell_size,
+        )
 
-class fontViewCell(ygLabel):
-    def __init__(self, dialog: fontViewWindow, glyph: list) -> None:
-        super().__init__()
-        self.dialog = dialog
-        self.glyph = glyph[1]
-        self.setFixedSize(36, 36)
-        self.has_hints = False
-        self.pixmap = None
-        self._current_glyph = False
-        self.make_pixmap()
-
-    # @property
-    # def current_glyph(self) -> bool:
-    #    return self._current_glyph
-
-    # @current_glyph.setter
-    # def current_glyph(self, b: bool) -> None:
-    #    self._current_glyph = b
-
-    def make_pixmap(self, force_redraw: bool = False) -> None:
-        """Make a pixmap for this cell and draw the glyph on it.
-        This makes for rapid painting and fast scrolling. If there's
-        a change, simply repaint the pixmap and call update() on the
-        cell.
+    def glyph_at(self, x: int, y: int) -> Optional[str]:
+        col = x // self.cell_size
+        if col < 0 or col >= FONT_VIEW_COLUMNS:
+            return None
+        i = (y // self.cell_size) * FONT_VIEW_COLUMNS + col
+        if i < 0 or i >= len(self.glyph_list):
+            return None
+        return self.glyph_list[i][1]
+
+    def cell_state(self, g: str) -> tuple:
+        """Whether glyph g has hints and whether it is the current glyph."""
+        return (self.dialog.yg_font.has_hints(g), g == self.dialog.current_glyph)
+
+    def update_cell(self, g: str, force_redraw: bool = False) -> None:
+        """Repaints the cell for glyph g if it is out of date (or, with
+        force_redraw, in any case).
         """
-        # Test to see if we really need to paint the pixmap.
-        is_composite = self.dialog.yg_font.is_composite(self.glyph)
-        has_hints_now = self.dialog.yg_font.has_hints(self.glyph)
-        if self.pixmap != None and self.has_hints == has_hints_now and not force_redraw:
-            return
-        else:
-            self.has_hints = has_hints_now
-
-        if self.pixmap == None:
-            self.pixmap = QPixmap(36, 36)
-
-        fill_color = None
-        if self.dialog.dark_theme:
-            if is_composite:
-                fill_color = FONT_VIEW_DARK_COMPOSITE
-            elif self.has_hints:
-                fill_color = FONT_VIEW_DARK_HINTED
-            else:
-                fill_color = FONT_VIEW_DARK_UNHINTED
-        else:
-            if is_composite:
-                fill_color = FONT_VIEW_COMPOSITE
-            elif self.has_hints:
-                fill_color = FONT_VIEW_HINTED
+        if force_redraw:
+            self.thumbnails.pop(g, None)
+        elif g in self.thumbnails:
+            if self.thumbnails[g][1] == self.cell_state(g):
+                return
+            del self.thumbnails[g]
+        r = self.cell_rect(g)
+        if r != None:
+            self.update(r)
+
+    def _job(self, g: str) -> dict:
+        has_hints, is_current = self.cell_state(g)
+        return {
+            "gname": g,
+            "size": self.dialog.size,
+            "cell_size": self.cell_size,
+            "dark_theme": self.dialog.dark_theme,
+            "is_composite": self.dialog.yg_font.is_composite(g),
+            "has_hints": has_hints,
+            "is_current": is_current,
+        }
+
+    @pyqtSlot(object)
+    def thumbnail_ready(self, result: dict) -> None:
+        job = result["job"]
+        g = job["gname"]
+        r = self.cell_rect(g)
+        if (
+            result["generation"] == self.dialog.thumbnail_pool.generation
+            and job["cell_size"] == self.cell_size
+            and job["size"] == self.dialog.size
+            and self.cell_state(g) == (job["has_hints"], job["is_current"])
+        ):
+            self.thumbnails[g] = (
+                result["image"],
+                (job["has_hints"], job["is_current"]),
+            )
+            while len(self.thumbnails) > self.max_thumbnails:
+                self.thumbnails.popitem(last=False)
+        if r != None:
+            # If the cell changed while its thumbnail was being made, this
+            # requests a new one.
+            self.update(r)
+
+    def cells_in(self, r: QRect) -> list:
+        """Returns a list of (glyph name, x, y) for the cells that intersect
+        rectangle r.
+        """
+        result = []
+        first_row = max(0, r.top() // self.cell_size)
+        last_row = r.bottom() // self.cell_size
+        first_col = max(0, r.left() // self.cell_size)
+        last_col = min(FONT_VIEW_COLUMNS - 1, r.right() // self.cell_size)
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                i = row * FONT_VIEW_COLUMNS + col
+                if i >= len(self.glyph_list):
+                    return result
+                result.append(
+                    (
+                        self.glyph_list[i][1],
+                        col * self.cell_size,
+                        row * self.cell_size,
+                    )
+                )
+        return result
+
+    def paintEvent(self, event) -> None:
+        """Paints the cells that intersect the exposed area. Cells without
+        thumbnails get their background color for now, and thumbnails are
+        requested for every such cell in view.
+        """
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, on=False)
+        painter.fillRect(event.rect(), self.background_color)
+        for g, x, y in self.cells_in(event.rect()):
+            if g in self.thumbnails:
+                self.thumbnails.move_to_end(g)
+                painter.drawImage(x, y, self.thumbnails[g][0])
             else:
-                fill_color = FONT_VIEW_UNHINTED
-        self.pixmap.fill(fill_color)
-
-        painter = QPainter(self.pixmap)
-
-        if self._current_glyph:
-            highlight_color = FONT_VIEW_HIGHLIGHT
-            r = QRect(1, 1, 34, 34)
-            qp = QPen(highlight_color)
-            qp.setWidth(2)
-            painter.setPen(qp)
-            painter.drawRect(r)
-
-        ind = self.dialog.face.name_to_index(self.glyph.encode(encoding="utf-8"))
-        self.dialog.face.set_render_mode(RENDER_LCD_1)
-        self.dialog.face.set_char(ind)
-        baseline = (
-            round((36 - self.dialog.face.face_height) / 2) + self.dialog.face.ascender
-        )
-        xpos = round((36 - self.dialog.face.advance) / 2)
-        self.dialog.face.draw_char(
-            painter, xpos, baseline, dark_theme=self.dialog.dark_theme
-        )
-
+                has_hints = self.cell_state(g)[0]
+                painter.fillRect(
+                    x,
+                    y,
+                    self.cell_size,
+                    self.cell_size,
+                    cell_fill_color(
+                        self.dialog.dark_theme,
+                        self.dialog.yg_font.is_composite(g),
+                        has_hints,
+                    ),
+                )
         painter.end()
-
-        self.setPixmap(self.pixmap)
+        # Request thumbnails for the whole of the visible area, not just the
+        # exposed part, since a request replaces the pool's queue.
+        jobs = [
+            self._job(g)
+            for g, x, y in self.cells_in(self.visibleRegion().boundingRect())
+            if not g in self.thumbnails
+        ]
+        if len(jobs):
+            self.dialog.thumbnail_pool.request(jobs)
 
     def mousePressEvent(self, event) -> None:
-        self.dialog.clicked_glyph(self.glyph)
+        qp = event.position()
+        g = self.glyph_at(int(qp.x()), int(qp.y()))
+        if g != None:
+            self.dialog.clicked_glyph(g)
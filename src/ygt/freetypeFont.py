@@ -1,10 +1,12 @@
 from typing import Optional
+from collections import OrderedDict
 import freetype as ft  # type: ignore
 import numpy
 
 # import copy
 from tempfile import SpooledTemporaryFile
-from PyQt6.QtGui import QColor, QPen, QImage, QPainter
+from .fontBuffer import fontBuffer
+from PyQt6.QtGui import QColor, QPen, QImage, QPainter, qRgba
 from PyQt6.QtCore import QLine
 
 RENDER_GRAYSCALE = 1
@@ -27,6 +29,70 @@ class ygLetterBox:
         return x >= self.x1 and x <= self.x2 and y >= self.y1 and y <= self.y2
 
 
+class ygBitmapCache:
+    """A bounded LRU cache of rendered glyphs (bitmap arrays and metrics),
+    for a freetypeFont.
+
+    The size waterfall renders one glyph at 90 sizes on every repaint, a
+    string renders each repeated glyph again, and the font view renders
+    every cell whenever it is redrawn: with this cache, each is rasterized
+    only once. Entries are keyed by glyph index, size, load flags (which
+    encode the render mode and hinting) and named instance.
+
+    The cache holds at most max_bytes of bitmap data. hits, misses and
+    nbytes are kept for tuning; stats() returns them in a dict.
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024) -> None:
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: tuple) -> Optional[tuple]:
+        """Returns a (metrics, bitmap) tuple, or None."""
+        r = self.entries.get(key)
+        if r == None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return r
+
+    def put(self, key: tuple, metrics: dict, bitmap: numpy.ndarray) -> None:
+        if key in self.entries:
+            self.nbytes -= self.entries[key][1].nbytes
+        self.entries[key] = (metrics, bitmap)
+        self.entries.move_to_end(key)
+        self.nbytes += bitmap.nbytes
+        while self.nbytes > self.max_bytes and len(self.entries) > 1:
+            k, v = self.entries.popitem(last=False)
+            self.nbytes -= v[1].nbytes
+
+    def clear(self) -> None:
+        """Drops all entries (but keeps the counters)."""
+        self.entries.clear()
+        self.nbytes = 0
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self.entries),
+            "bytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate(),
+        }
+
+
 class freetypeFont:
     """Holds a FreeType font. It will also keep the metrics and supply
     key info, e.g. the ascender, or the top of a bitmap for a specific
@@ -35,11 +101,16 @@ class freetypeFont:
 
     params:
 
-    font: must be either a SpooledTemporaryFile or a str (filename).
+    font: a fontBuffer (the face is made from its memory, not copied), a
+    SpooledTemporaryFile or other binary stream, or a str (filename).
 
     size (int): The initial size of the characters (in pixels per em).
     Default is 30.
 
+    bitmap_cache (ygBitmapCache): A cache for rendered glyphs. Pass the
+    cache of a font being replaced to keep its counters (it is cleared);
+    otherwise a new one is made.
+
     Minimal example, to draw a character in the default size:
       ftf = freetypeFont("Elstob-Regular.ttf")
       # The GID of the desired character
@@ -49,16 +120,24 @@ class freetypeFont:
 
     def __init__(
         self,
-        font: SpooledTemporaryFile | str,
+        font: fontBuffer | SpooledTemporaryFile | str,
         size: int = 30,
         render_mode: int = RENDER_LCD_1,
         hinting_on: bool = True,
         instance: str = None,
         keep_open: bool = False,
+        bitmap_cache: Optional[ygBitmapCache] = None,
     ) -> None:
         self.valid = True
+        if bitmap_cache == None:
+            bitmap_cache = ygBitmapCache()
+        else:
+            bitmap_cache.clear()
+        self.bitmap_cache = bitmap_cache
         try:
-            if type(font) is SpooledTemporaryFile:
+            if isinstance(font, fontBuffer):
+                self.face = ft.Face(font.stream())
+            elif type(font) is SpooledTemporaryFile:
                 font.seek(0)
                 self.face = ft.Face(font)
                 if not keep_open:
@@ -72,20 +151,23 @@ class freetypeFont:
             self.valid = False
             return
         self.char_size = size * 64
-        self.size = 30
+        self.size = size
         self.ascender = 0
         self.descender = 0
         self.face_height = 0
         self.advance = 0
         self.glyph_slot: Optional[ft.GlyphSlot] = None
         self.glyph_index = 0
+        # Metrics and bitmap (a NumPy array: see mk_array) of the current
+        # glyph, perhaps from the cache. Use these, not self.glyph_slot,
+        # which is not updated when the glyph comes from the cache.
+        self.metrics: dict = {}
+        self.bitmap: numpy.ndarray = numpy.zeros((0, 0), dtype=numpy.ubyte)
         self.bitmap_top = 0
         self.bitmap_left = 0
         self.top_offset = 0
         self.instance = instance
         self.hinting_on = hinting_on
-        self.bw_colors = self.mk_bw_color_list()
-        self.bw_colors_dark = self.mk_bw_color_list(dark=True)
         self.draw_char = self._draw_char_lcd
         self.set_render_mode(render_mode)
         self.face.set_char_size(self.char_size)
@@ -93,18 +175,18 @@ class freetypeFont:
         # self.last_glyph_index = None
         self.rect_list: list = []
 
-    def mk_bw_color_list(self, dark: bool = False) -> list:
-        l = [0] * 256
-        for count, c in enumerate(l):
-            if dark:
-                l[count] = QColor(255, 255, 255, count)
-            else:
-                l[count] = QColor(0, 0, 0, count)
-        return l
-
     def reset_rect_list(self):
         self.rect_list = []
 
+    def close(self) -> None:
+        """Frees the FreeType face now, rather than whenever this object is
+        collected (it refers to itself, through draw_char, so it is freed
+        by the cycle collector, which may run in any thread). The object
+        can't be used after this.
+        """
+        self.glyph_slot = None
+        self.face = None
+
     def set_params(
         self, glyph=None, render_mode=None, hinting_on=None, size=None, instance=None
     ):
@@ -160,7 +242,8 @@ class freetypeFont:
     def set_char(self, glyph_index):
         """Load a glyph (given its index in the font), generating the appropriate
         kind of bitmap, and populate class variables with glyph-specific metrics
-        info.
+        info. Glyphs already rendered with the same settings come from the
+        cache.
         """
         self.glyph_index = glyph_index
         flags = 4  # i.e. grayscale
@@ -170,14 +253,23 @@ class freetypeFont:
             flags = ft.FT_LOAD_RENDER | ft.FT_LOAD_TARGET_LCD
         if not self.hinting_on:
             flags = flags | ft.FT_LOAD_NO_HINTING | ft.FT_LOAD_NO_AUTOHINT
-        self.face.load_glyph(self.glyph_index, flags=flags)
-        self.glyph_slot = self.face.glyph
-        self.advance = round(self.glyph_slot.advance.x / 64)
-        self.bitmap_top = self.glyph_slot.bitmap_top
-        self.bitmap_left = self.glyph_slot.bitmap_left
+        key = (self.glyph_index, self.size, flags, self.instance)
+        cached = self.bitmap_cache.get(key)
+        if cached != None:
+            self.metrics, self.bitmap = cached
+        else:
+            self.face.load_glyph(self.glyph_index, flags=flags)
+            self.glyph_slot = self.face.glyph
+            self.metrics = self._get_slot_metrics()
+            # Copy: mk_array returns a view of the glyph slot.
+            self.bitmap = self.mk_array(self.metrics, self.render_mode).copy()
+            self.bitmap_cache.put(key, self.metrics, self.bitmap)
+        self.advance = self.metrics["advance"]
+        self.bitmap_top = self.metrics["bitmap_top"]
+        self.bitmap_left = self.metrics["bitmap_left"]
         self.top_offset = self.ascender - self.bitmap_top
 
-    def _get_bitmap_metrics(self):
+    def _get_slot_metrics(self):
         r = {}
         r["width"] = self.glyph_slot.bitmap.width
         r["rows"] = self.glyph_slot.bitmap.rows
@@ -187,39 +279,68 @@ class freetypeFont:
         r["advance"] = round(self.glyph_slot.advance.x / 64)
         return r
 
+    def _get_bitmap_metrics(self):
+        """Returns (a copy of) the metrics of the current glyph."""
+        return dict(self.metrics)
+
+    def bitmap_view(self, bitmap=None) -> numpy.ndarray:
+        """Returns the rows of a FreeType bitmap (by default the one in the
+        glyph slot) as a two-dimensional array of bytes, pitch bytes wide.
+
+        This is a view of FreeType's own buffer, not a copy: it is only
+        good until the next glyph is loaded. (freetype-py's bitmap.buffer
+        property, by contrast, builds a Python list one byte at a time.)
+        """
+        if bitmap == None:
+            bitmap = self.glyph_slot.bitmap
+        rows = bitmap.rows
+        pitch = bitmap.pitch
+        if rows == 0 or pitch == 0:
+            return numpy.zeros((rows, abs(pitch)), dtype=numpy.ubyte)
+        buf = numpy.ctypeslib.as_array(
+            bitmap._FT_Bitmap.buffer, shape=(rows * abs(pitch),)
+        ).reshape(rows, abs(pitch))
+        if pitch < 0:
+            # The rows run upward (bottom row first).
+            buf = buf[::-1]
+        return buf
+
     def monomap_to_array(self, bitmap):
-        data = [0] * (bitmap.rows * bitmap.width)
-        for y in range(bitmap.rows):
-            for byte_index in range(bitmap.pitch):
-                byte_value = bitmap.buffer[y * bitmap.pitch + byte_index]
-                rowstart = y * bitmap.width + byte_index * 8
-                num_bits_done = byte_index * 8
-                bits = 8
-                if (bitmap.width - num_bits_done) < 8:
-                    bits = bitmap.width - num_bits_done
-                for bit_index in range(bits):
-                    bit = byte_value & (1 << (7 - bit_index))
-                    if bit:
-                        data[rowstart + bit_index] = 1
-        return list(data)
+        """Unpacks a 1-bit bitmap into a rows x width array of 0s and 1s."""
+        return numpy.unpackbits(self.bitmap_view(bitmap), axis=1)[:, : bitmap.width]
 
     def mk_array(self, metrics, render_mode):
-        data = []
+        """Returns the bitmap in the glyph slot as a NumPy array: rows x width
+        for grayscale and mono (with 0 or 1 for each pixel), rows x width/3 x 3
+        for LCD. Except for mono, the array is a view of FreeType's buffer
+        (see bitmap_view).
+        """
         rows = metrics["rows"]
         width = metrics["width"]
-        pitch = metrics["pitch"]
         if render_mode == RENDER_MONO:
-            newmap = self.monomap_to_array(self.glyph_slot.bitmap)
-        else:
-            newmap = self.glyph_slot.bitmap.buffer
-        for i in range(rows):
-            data.extend(newmap[i * pitch : i * pitch + width])
+            return self.monomap_to_array(self.glyph_slot.bitmap)
+        data = self.bitmap_view()[:rows, :width]
         if render_mode == RENDER_GRAYSCALE:
-            return numpy.array(data, dtype=numpy.ubyte).reshape(rows, width)
-        elif render_mode == RENDER_MONO:
-            return newmap
+            return data
         else:
-            return numpy.array(data, dtype=numpy.ubyte).reshape(rows, int(width / 3), 3)
+            return data.reshape(rows, int(width / 3), 3)
+
+    def _draw_alpha_mask(self, painter, mask, x, y, color):
+        """Draws a grayscale bitmap (a NumPy array) in the given color, using
+        the bitmap as an alpha mask, with one drawImage.
+        """
+        mask = numpy.ascontiguousarray(mask)
+        height, width = mask.shape
+        alpha = QImage(mask.data, width, height, width, QImage.Format.Format_Alpha8)
+        # Fill an image with the color, then keep it only where the mask is.
+        img = QImage(width, height, QImage.Format.Format_ARGB32_Premultiplied)
+        img.fill(color)
+        p = QPainter(img)
+        p.setCompositionMode(QPainter.CompositionMode.CompositionMode_DestinationIn)
+        p.drawImage(0, 0, alpha)
+        p.end()
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
+        painter.drawImage(x, y, img)
 
     def _draw_char_lcd(
         self,
@@ -256,7 +377,7 @@ class freetypeFont:
         gdata = self._get_bitmap_metrics()
 
         # Get the Freetype bitmap into a numpy array and get dimensions.
-        Z = self.mk_array(gdata, RENDER_LCD_1)
+        Z = self.bitmap
         height, width, channel = Z.shape
         bytesPerLine = channel * width
 
@@ -264,6 +385,8 @@ class freetypeFont:
 
         if not dark_theme:
             Z = 255 - Z
+        # QImage needs the rows packed together.
+        Z = numpy.ascontiguousarray(Z)
 
         # Get starting position and metrics. For zero-width marks, we expand the width,
         # but only if spacing_mark=True.
@@ -331,7 +454,7 @@ class freetypeFont:
         y_offset=0,
     ):
         gdata = self._get_bitmap_metrics()
-        bm = self.mk_array(gdata, self.render_mode)
+        bm = self.bitmap
         ypos = (y - gdata["bitmap_top"]) - y_offset
         starting_ypos = ypos
         is_mark = spacing_mark and (gdata["advance"] == 0)
@@ -341,18 +464,27 @@ class freetypeFont:
             gdata["advance"] = self.advance = gdata["width"] + 4
         else:
             starting_xpos = xpos = (x + gdata["bitmap_left"]) + x_offset
-        qp = QPen(QColor("white") if dark_theme else QColor("black"))
-        qp.setWidth(1)
-        painter.setPen(qp)
-        bytestepper = 0
-        for r in range(gdata["rows"]):
-            xpos = starting_xpos
-            for w in range(gdata["width"]):
-                if bm[bytestepper]:
-                    painter.drawPoint(xpos, ypos)
-                bytestepper += 1
-                xpos += 1
-            ypos += 1
+        if bm.size > 0:
+            # Pack the bits again for a 1-bit image, whose color table makes
+            # unset pixels transparent and set ones black or white.
+            packed = numpy.packbits(bm, axis=1)
+            img = QImage(
+                packed.data,
+                gdata["width"],
+                gdata["rows"],
+                packed.shape[1],
+                QImage.Format.Format_Mono,
+            )
+            img.setColorTable(
+                [
+                    qRgba(0, 0, 0, 0),
+                    QColor("white").rgba() if dark_theme else QColor("black").rgba(),
+                ]
+            )
+            painter.setCompositionMode(
+                QPainter.CompositionMode.CompositionMode_SourceOver
+            )
+            painter.drawImage(starting_xpos, starting_ypos, img)
         ending_xpos = starting_xpos + round(gdata["advance"])
         ending_ypos = starting_ypos + gdata["rows"]
         if is_target:
@@ -400,7 +532,7 @@ class freetypeFont:
 
         """
         gdata = self._get_bitmap_metrics()
-        Z = self.mk_array(gdata, self.render_mode)
+        Z = self.bitmap
         ypos = (y - gdata["bitmap_top"]) - y_offset
         starting_ypos = ypos
         is_mark = spacing_mark and (gdata["advance"] == 0)
@@ -410,19 +542,14 @@ class freetypeFont:
             gdata["advance"] = self.advance = gdata["width"] + 4
         else:
             starting_xpos = xpos = (x + gdata["bitmap_left"]) + x_offset
-        qp = QPen(QColor("black"))
-        qp.setWidth(1)
-        for row in Z:
-            xpos = starting_xpos
-            for col in row:
-                if dark_theme:
-                    qp.setColor(self.bw_colors_dark[col])
-                else:
-                    qp.setColor(self.bw_colors[col])
-                painter.setPen(qp)
-                painter.drawPoint(xpos, ypos)
-                xpos += 1
-            ypos += 1
+        if Z.size > 0:
+            self._draw_alpha_mask(
+                painter,
+                Z,
+                starting_xpos,
+                starting_ypos,
+                QColor("white") if dark_theme else QColor("black"),
+            )
         ending_xpos = starting_xpos + round(gdata["advance"])
         ending_ypos = starting_ypos + gdata["rows"]
         if is_target:
@@ -523,8 +650,8 @@ class freetypeFont:
             # and correct positioning of diacritics. These will still be valid
             # for our mini-font--only we've got to translate gids in Harfbuzz's
             # cooy of our font to gids in the subsetted font returned by
-            # window.ygPreviewFontMaker. We do this by doing gid-->gname before
-            # running window.ygPreviewFontMaker and gname-->gid afterwards.
+            # ygPreviewBuilder.ygPreviewFontMaker. We do this by doing gid-->gname before
+            # running ygPreviewBuilder.ygPreviewFontMaker and gname-->gid afterwards.
             if len(positions):
                 x_offset = self.font_to_pixels(positions[count].x_offset)
                 y_offset = self.font_to_pixels(positions[count].y_offset)
@@ -1,3 +1,4 @@
+from PyQt6.QtCore import QStringListModel
 from PyQt6.QtWidgets import (
     QDialog,
     QLineEdit,
@@ -6,15 +7,39 @@ from PyQt6.QtWidgets import (
     QDialogButtonBox,
 )
 
+# The most glyph names the completer will offer at once.
+PICKER_MAX_RESULTS = 200
+
 
 class ygGlyphPicker(QDialog):
-    def __init__(self, glyph_name_list, parent):
+    """The Find Glyph dialog.
+
+    If it is given a search index (a ygSearch.ygGlyphIndex), the completer
+    offers the results of a search for what has been typed (see ygSearch
+    for the syntax), and accepting a query that isn't a glyph name goes to
+    the first result. Otherwise it completes from glyph_name_list.
+    """
+
+    def __init__(self, glyph_name_list, parent, search_index=None):
         super().__init__(parent=parent)
         self.setWindowTitle("Find Glyph")
         self.result = ""
+        self.search_index = search_index
         _layout = QVBoxLayout()
-        completer = QCompleter(glyph_name_list)
         self.editor = QLineEdit()
+        if search_index == None:
+            completer = QCompleter(glyph_name_list)
+        else:
+            self.model = QStringListModel()
+            completer = QCompleter(self.model, self)
+            completer.setCompletionMode(
+                QCompleter.CompletionMode.UnfilteredPopupCompletion
+            )
+            self.editor.textEdited.connect(self.update_completions)
+            self.editor.setToolTip(
+                "A glyph name or part of one, U+0041, cat:Lu, hinted:yes,\n"
+                + "composite:no, comp:acutecomb"
+            )
         self.editor.setCompleter(completer)
         QBtn = (
             QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel
@@ -26,11 +51,22 @@ class ygGlyphPicker(QDialog):
         _layout.addWidget(buttonBox)
         self.setLayout(_layout)
 
+    def _search(self, t: str) -> list:
+        if len(t.strip()) == 0:
+            return []
+        return self.search_index.search_names(t, limit=PICKER_MAX_RESULTS)
+
+    def update_completions(self, t: str) -> None:
+        self.model.setStringList(self._search(t))
+
     def reject(self) -> None:
         self.done(QDialog.DialogCode.Rejected)
 
     def accept(self) -> None:
         t = self.editor.text()
+        if t and self.search_index != None and not t in self.search_index.positions:
+            r = self._search(t)
+            t = r[0] if r else ""
         if t:
             self.result = t
             self.done(QDialog.DialogCode.Accepted)
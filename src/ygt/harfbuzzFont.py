@@ -11,6 +11,7 @@ from PyQt6.QtCore import QRegularExpression, pyqtSlot
 import uharfbuzz as hb
 from tempfile import SpooledTemporaryFile
 from .freetypeFont import freetypeFont
+from .fontBuffer import fontBuffer
 
 
 class harfbuzzFont:
@@ -944,7 +945,7 @@ class harfbuzzFont:
 
     def __init__(
         self,
-        font: SpooledTemporaryFile | str,
+        font: fontBuffer | SpooledTemporaryFile | str,
         ft_font: freetypeFont,
         keep_open=False,
     ):
@@ -953,7 +954,15 @@ class harfbuzzFont:
         #
         # Read the font
         #
-        if type(font) is SpooledTemporaryFile:
+        if isinstance(font, fontBuffer):
+            # HarfBuzz takes bytes without copying them. For a mapped
+            # file (a UFO cache entry) it maps the file itself, sharing
+            # the pages of fontBuffer's map.
+            if font.mapped:
+                font_data = hb.Blob.from_file_path(font.path)
+            else:
+                font_data = hb.Blob(font.data)
+        elif type(font) is SpooledTemporaryFile:
             font.seek(0)
             font_data = font.read()
             if not keep_open:
@@ -0,0 +1,195 @@
+"""An on-disk cache of TrueType fonts compiled from UFOs.
+
+Compiling a large UFO with ufo2ft can take many seconds, and the editor
+does it every time a .ufo is opened. ygUFOCache keeps the compiled font,
+with a manifest recording a digest of every file in the UFO that goes into
+it, and compiles again only when one of those files has changed.
+
+The manifest also keeps each file's size and modification time, so that
+files that haven't been touched needn't be read again to be hashed. The
+data directory (where ygt keeps its source) and images are not part of
+the compiled font, so saving the ygt source doesn't invalidate the cache.
+
+The whole font is recompiled when anything changes: ufo2ft compiles a font,
+not single glyphs.
+
+This module does not import PyQt6.
+"""
+
+from typing import Optional
+import os
+import json
+import hashlib
+import tempfile
+from fontTools import version as fonttools_version  # type: ignore
+from .fontBuffer import fontBuffer
+
+UFO_CACHE_FORMAT = 1
+
+# Directories of a UFO that don't go into the compiled font.
+UFO_IGNORED_DIRS = ["data", "images"]
+
+# Options passed to ufo2ft's compileTTF (recorded in the manifest).
+UFO_COMPILE_OPTIONS = {"useProductionNames": False, "reverseDirection": False}
+
+
+def default_cache_dir() -> str:
+    return os.path.join(os.path.expanduser("~/.ygt"), "ufo-cache")
+
+
+def _file_digest(path: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def compile_ufo(ufo_path: str) -> fontBuffer:
+    """Compiles a UFO to TrueType (as the editor does it), without the
+    cache.
+    """
+    import defcon  # type: ignore
+    from ufo2ft import compileTTF  # type: ignore
+
+    return fontBuffer(compileTTF(defcon.Font(ufo_path), **UFO_COMPILE_OPTIONS))
+
+
+class ygUFOCache:
+    """A directory of compiled fonts, each with a manifest (a .json file
+    next to it). Entries are named for a digest of the UFO's path, so a
+    UFO has one entry, replaced whenever it is recompiled. At most
+    max_fonts entries are kept; the ones used least recently are removed.
+
+    Parameters:
+
+    cache_dir (str): The cache directory (by default ~/.ygt/ufo-cache).
+
+    max_fonts (int): The most compiled fonts to keep.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_fonts: int = 10) -> None:
+        if cache_dir == None:
+            cache_dir = default_cache_dir()
+        self.cache_dir = cache_dir
+        self.max_fonts = max_fonts
+        # Whether the last call to load() compiled the UFO.
+        self.compiled = False
+
+    def _entry(self, ufo_path: str) -> str:
+        name = hashlib.blake2b(
+            os.path.abspath(ufo_path).encode(), digest_size=16
+        ).hexdigest()
+        return os.path.join(self.cache_dir, name)
+
+    def _globals(self) -> dict:
+        import defcon  # type: ignore
+        import ufo2ft  # type: ignore
+
+        return {
+            "format": UFO_CACHE_FORMAT,
+            "fonttools": fonttools_version,
+            "defcon": defcon.__version__,
+            "ufo2ft": ufo2ft.__version__,
+            "options": UFO_COMPILE_OPTIONS,
+        }
+
+    def file_digests(self, ufo_path: str, old_files: Optional[dict] = None) -> dict:
+        """Returns a dict of the files in the UFO that go into the compiled
+        font: path (relative to the UFO) -> [size, mtime_ns, digest]. A
+        file whose size and modification time match its entry in old_files
+        keeps the digest recorded there.
+        """
+        if old_files == None:
+            old_files = {}
+        result = {}
+        for d, dirs, files in os.walk(ufo_path):
+            rel_d = os.path.relpath(d, ufo_path)
+            if rel_d == ".":
+                dirs[:] = [x for x in dirs if not x in UFO_IGNORED_DIRS]
+            dirs[:] = [x for x in dirs if not x.startswith(".")]
+            for f in files:
+                if f.startswith("."):
+                    continue
+                path = os.path.join(d, f)
+                rel = os.path.normpath(os.path.join(rel_d, f)).replace(os.sep, "/")
+                st = os.stat(path)
+                old = old_files.get(rel)
+                if old != None and old[0] == st.st_size and old[1] == st.st_mtime_ns:
+                    digest = old[2]
+                else:
+                    digest = _file_digest(path)
+                result[rel] = [st.st_size, st.st_mtime_ns, digest]
+        return result
+
+    def _read_manifest(self, entry: str) -> Optional[dict]:
+        try:
+            with open(entry + ".json", "r") as f:
+                return json.load(f)
+        except Exception:
+            return None
+
+    def load(self, ufo_path: str) -> fontBuffer:
+        """Returns the compiled font for the UFO, compiling it if it isn't
+        in the cache or has changed. The font is mapped from the cache
+        file (see fontBuffer), which is safe because cache files are only
+        ever replaced, never rewritten. If the cache can't be written, the
+        font is compiled into memory.
+        """
+        self.compiled = False
+        entry = self._entry(ufo_path)
+        manifest = self._read_manifest(entry)
+        old_files = None
+        if manifest != None and manifest.get("globals") == self._globals():
+            old_files = manifest.get("files")
+        files = self.file_digests(ufo_path, old_files)
+        if files == old_files and os.path.exists(entry + ".ttf"):
+            try:
+                os.utime(entry + ".json")
+            except OSError:
+                pass
+            return fontBuffer(entry + ".ttf", map_file=True)
+
+        self.compiled = True
+        font = compile_ufo(ufo_path)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write to temporary files and move them into place, so that
+            # an entry is never half-written, and a font already mapped
+            # from the old file is undisturbed.
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(font.data)
+            os.replace(tmp, entry + ".ttf")
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(
+                    {
+                        "globals": self._globals(),
+                        "ufo": os.path.abspath(ufo_path),
+                        "files": files,
+                    },
+                    f,
+                )
+            os.replace(tmp, entry + ".json")
+            self.prune()
+        except OSError as e:
+            print("Can't write to the UFO cache: " + str(e))
+            return font
+        return fontBuffer(entry + ".ttf", map_file=True)
+
+    def prune(self) -> None:
+        """Removes the least recently used entries, keeping max_fonts."""
+        try:
+            manifests = [
+                os.path.join(self.cache_dir, f)
+                for f in os.listdir(self.cache_dir)
+                if f.endswith(".json")
+            ]
+            manifests.sort(key=os.path.getmtime, reverse=True)
+            for m in manifests[self.max_fonts :]:
+                for p in [m, m[:-5] + ".ttf"]:
+                    if os.path.exists(p):
+                        os.remove(p)
+        except OSError as e:
+            print(e)
@@ -3,6 +3,7 @@ from typing import Any, Union, Optional
 import sys
 import os
 import copy
+import multiprocessing
 import yaml
 from .ygModel import ygFont, ygGlyph, unicode_cat_names
 from .fontViewDialog import fontViewWindow
@@ -30,10 +31,21 @@ from .ygSchema import (
 )
 from .ygError import ygErrorMessages
 from .makeCVDialog import fontInfoWindow
-from xgridfit import compile_list  # type: ignore
+from .ygCompiler import ygProgramCache
+from .ygCompiler import export_font as parallel_export_font
+from .fontBuffer import fontBuffer
+from .ygPreviewBuilder import ygPreviewScheduler
 from xgridfit import run as xgf_run  # type: ignore
 from fontTools import ufoLib  # type: ignore
-from PyQt6.QtCore import Qt, QSize, QThread, pyqtSlot, pyqtSignal, QObject, QEvent
+from PyQt6.QtCore import (
+    Qt,
+    QSize,
+    QThread,
+    pyqtSlot,
+    pyqtSignal,
+    QObject,
+    QEvent,
+)
 from PyQt6.QtWidgets import (
     QWidget,
     QApplication,
@@ -60,7 +72,6 @@ from PyQt6.QtGui import (
     QAction,
     QFontDatabase,
 )
-from fontTools import ttLib, ufoLib  # type: ignore
 from .harfbuzzFont import harfbuzzFont, hbFeatureDialog
 from .glyphPicker import ygGlyphPicker
 
@@ -70,58 +81,21 @@ FileNameVar = Union[str, tuple[str, Any]]
 ygt_version = "0.2.7"
 
 
-class ygPreviewFontMaker(QThread):
-    """To be run from a QThread. This is because it can take the better
-    part of a second to generate a preview, even on a pretty fast
-    machine, and we want to be able to run this on a signal without
-    making the GUI balky.
-
-    Parameters:
-
-    font: a fontTools representation of the font
-
-    source: the source for this font's hints
+class ygFontGenerator(QThread):
+    """For generating whole fonts.
 
-    glyph_list: the names of the glyphs for which we want to make the preview.
+    Glyph programs are compiled in a pool of worker processes (see
+    ygCompiler.export_font) except in merge-mode or when the output is a
+    UFO, when the job is handed to xgridfit.
     """
 
-    sig_preview_ready = pyqtSignal(object)
-    sig_preview_error = pyqtSignal()
-
-    def __init__(self, font: ttLib.TTFont, source: dict, glyph_list: list) -> None:
-        super().__init__()
-        self.ft_font = font
-        self.source = source
-        self.glyph_list = []
-        for g in glyph_list:
-            try:
-                self.glyph_list.append(g.decode(encoding="utf-8"))
-            except Exception:
-                self.glyph_list.append(g)
-        self.error = False
-
-    def run(self) -> None:
-        try:
-            font = copy.deepcopy(self.ft_font)
-            tmp_font, glyph_index, failed_glyph_list = compile_list(
-                font, self.source, self.glyph_list
-            )
-            self.sig_preview_ready.emit(
-                {"font": tmp_font, "gindex": glyph_index, "failed": failed_glyph_list}
-            )
-        except Exception as e:
-            self.sig_preview_error.emit()
-
-
-class ygFontGenerator(QThread):
-    """For generating whole fonts."""
-
     sig_font_gen_done = pyqtSignal(object)
     sig_font_gen_error = pyqtSignal()
+    sig_font_gen_progress = pyqtSignal(int, int)
 
     def __init__(
         self,
-        font: ttLib.TTFont,
+        font: fontBuffer,
         source: dict,
         output_font: str,
         mergemode: bool = False,
@@ -151,7 +125,21 @@ class ygFontGenerator(QThread):
 
     def run(self) -> None:
         try:
-            font = copy.deepcopy(self.ft_font)
+            if not self.mergemode and not self.output_font.endswith(".ufo"):
+                try:
+                    failed_glyph_list = parallel_export_font(
+                        self.ft_font,
+                        self.source,
+                        self.output_font,
+                        progress=self.sig_font_gen_progress.emit,
+                    )
+                except Exception as e:
+                    print(e)
+                    self.sig_font_gen_error.emit()
+                    return
+                self.sig_font_gen_done.emit(failed_glyph_list)
+                return
+            font = self.ft_font.copy()
             err, failed_glyph_list = xgf_run(
                 font=font,
                 yaml=self.source,
@@ -207,6 +195,11 @@ class MainWindow(QMainWindow):
             "QLabel {font-family: Source Code Pro, monospace; margin-left: 10px; }"
         )
         self.statusbar.addWidget(self.statusbar_label)
+        self.preview_time_label = QLabel()
+        self.preview_time_label.setStyleSheet(
+            "QLabel {font-family: Source Code Pro, monospace; margin-right: 10px; }"
+        )
+        self.statusbar.addPermanentWidget(self.preview_time_label)
 
         # Get icons for toolbar.
         if getattr(sys, "frozen", False) and hasattr(sys, "_MEIPASS"):
@@ -260,7 +253,10 @@ class MainWindow(QMainWindow):
         self.feature_menu = None
         self.feature_reset_action = None
         self.custom_feature_action = None
-        self.preview_maker: Optional[ygPreviewFontMaker] = None
+        self.preview_scheduler = ygPreviewScheduler(parent=self)
+        self.preview_scheduler.sig_preview_ready.connect(self.preview_ready)
+        self.preview_scheduler.sig_preview_error.connect(self.preview_error)
+        self.program_cache: Optional[ygProgramCache] = None
         self.font_generator: Optional[ygFontGenerator] = None
         self.auto_preview_update = True
 
@@ -740,6 +736,14 @@ class MainWindow(QMainWindow):
             self.yg_preview.update()
         except Exception:
             pass
+        if "latency" in args:
+            self.preview_time_label.setText(
+                "Preview: "
+                + str(round(args["build_time"] * 1000))
+                + " ms (latency "
+                + str(round(args["latency"] * 1000))
+                + " ms)"
+            )
 
     @pyqtSlot()
     def toggle_auto_preview(self) -> None:
@@ -755,13 +759,6 @@ class MainWindow(QMainWindow):
         self._preview_current_glyph()
 
     def _preview_current_glyph(self) -> None:
-        try:
-            if self.preview_maker != None and self.preview_maker.isRunning():
-                return
-        except RuntimeError as e:
-            # We get this RuntimeError when self.thread has been garbage collected.
-            # It means that it's safe to run the rest of this function.
-            pass
         source = self.yg_font.source
         font = self.yg_font.preview_font
         self.preview_glyph_name = self.glyph_pane.yg_glyph_scene.yg_glyph.gname
@@ -791,13 +788,9 @@ class MainWindow(QMainWindow):
         # What function does this line serve?
         self.yg_string_preview.set_face(self.yg_preview.face)
 
-        self.preview_maker = ygPreviewFontMaker(
-            font, source, self.preview_glyph_name_list
+        self.preview_scheduler.request(
+            font, source, self.preview_glyph_name_list, cache=self.program_cache
         )
-        self.preview_maker.finished.connect(self.preview_maker.deleteLater)
-        self.preview_maker.sig_preview_ready.connect(self.preview_ready)
-        self.preview_maker.sig_preview_error.connect(self.preview_error)
-        self.preview_maker.start()
 
         self.pv_bigger_one_action.setEnabled(True)
         self.pv_bigger_ten_action.setEnabled(True)
@@ -1201,6 +1194,9 @@ class MainWindow(QMainWindow):
     def add_undo_stack(self, s: QUndoStack) -> None:
         self.undo_group.addStack(s)
 
+    def remove_undo_stack(self, s: QUndoStack) -> None:
+        self.undo_group.removeStack(s)
+
     def set_all_clean(self):
         s = self.undo_group.stacks()
         for ss in s:
@@ -1214,6 +1210,24 @@ class MainWindow(QMainWindow):
                 return False
         return True
 
+    def source_in_use(self) -> bool:
+        """Whether a build running in another thread may be reading the
+        font's source.
+        """
+        if self.preview_scheduler.is_busy():
+            return True
+        try:
+            if self.font_generator != None and self.font_generator.isRunning():
+                return True
+        except RuntimeError:
+            # The thread has finished and been deleted.
+            pass
+        if self.font_viewer:
+            scheduler = self.font_viewer.hinted_scheduler
+            if scheduler != None and scheduler.is_busy():
+                return True
+        return False
+
     #
     # File operations
     #
@@ -1311,6 +1325,7 @@ class MainWindow(QMainWindow):
         self.font_generator.finished.connect(self.font_generator.deleteLater)
         self.font_generator.sig_font_gen_done.connect(self.font_gen_finished)
         self.font_generator.sig_font_gen_error.connect(self.font_gen_error)
+        self.font_generator.sig_font_gen_progress.connect(self.font_gen_progress)
         self.font_generator.start()
         self.progress_bar = QProgressBar()
         self.progress_bar.setMaximum(0)
@@ -1318,6 +1333,12 @@ class MainWindow(QMainWindow):
             self.spacer_action, self.progress_bar
         )
 
+    @pyqtSlot(int, int)
+    def font_gen_progress(self, done: int, total: int) -> None:
+        if self.progress_bar != None:
+            self.progress_bar.setMaximum(total)
+            self.progress_bar.setValue(done)
+
     @pyqtSlot(object)
     def font_gen_finished(self, failed_list: list) -> None:
         self.toolbar.removeAction(self.progress_bar_action)
@@ -1544,6 +1565,8 @@ class MainWindow(QMainWindow):
                 self.yg_font = None
                 return 3
             self.yg_font.setup_error_signal(self.error_manager.new_message)
+            self.program_cache = ygProgramCache()
+            load_timer = self.yg_font.load_timer
 
             self.setup_script_menu()
             self.setup_language_menu()
@@ -1554,6 +1577,7 @@ class MainWindow(QMainWindow):
 
             self.source_editor = ygYAMLEditor(self.preferences)
             self.add_editor(self.source_editor)
+            load_timer.lap("set up menus, preview and editor")
 
             if (
                 "current_glyph" in self.preferences
@@ -1566,6 +1590,7 @@ class MainWindow(QMainWindow):
             modelGlyph.set_yaml_editor(self.source_editor)
             yg_glyph_scene = ygGlyphScene(self.preferences, modelGlyph)
             view = ygGlyphView(self.preferences, yg_glyph_scene, self.yg_font)
+            load_timer.lap("set up first glyph")
             yg_glyph_scene.owner = view
             self.add_glyph_pane(view)
             w = self.width()
@@ -1578,6 +1603,8 @@ class MainWindow(QMainWindow):
             self.setup_preview_instance_connections()
             # Should we send a signal for preview update from here?
             self._preview_current_glyph()
+            load_timer.lap("set up window")
+            load_timer.report("Opened " + filename)
         return 0
 
     #
@@ -1859,7 +1886,9 @@ class MainWindow(QMainWindow):
     @pyqtSlot()
     def show_find_dialog(self) -> None:
         """Display 'Find Glyph' dialog."""
-        gp = ygGlyphPicker(self.yg_font.ft_font.getGlyphNames(), self)
+        gp = ygGlyphPicker(
+            self.yg_font.ft_font.getGlyphNames(), self, self.yg_font.search_index
+        )
         ret = gp.exec()
         if ret == QDialog.DialogCode.Accepted:
             result = gp.result
@@ -2075,7 +2104,7 @@ class mainWinEventFilter(QObject):
             if self.top_window.isActiveWindow():
                 self.top_window.preferences["top_window"] = self.top_window
         return super().eventFilter(source, event)
-    
+
 
 # def trace_lines(frame, event, arg):
 #     if event != 'line':
@@ -2106,15 +2135,20 @@ class mainWinEventFilter(QObject):
 
 # TRACE_INTO = ['text_changed', 'fixup']
 
+
 def main():
     # import uharfbuzz
     # from inspect import getfullargspec, signature
-    #print(dir(QAbstractItemView.SelectionMode))
+    # print(dir(QAbstractItemView.SelectionMode))
     # print(dir(QPainter))
     # print(dir(hb._harfbuzz.hb_font_set_var_named_instance))
     # print(dir(hb._harfbuzz.Buffer))
 
-    #sys.settrace(trace_calls)
+    # sys.settrace(trace_calls)
+
+    # Export runs glyph compilation in worker processes, which need this
+    # when we're frozen by PyInstaller.
+    multiprocessing.freeze_support()
 
     app = QApplication([])
 
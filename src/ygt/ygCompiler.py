@@ -0,0 +1,621 @@
+from typing import Any, Optional, Tuple, Callable
+import os
+import json
+import base64
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from ast import literal_eval
+from collections import OrderedDict
+from tempfile import SpooledTemporaryFile
+from lxml import etree  # type: ignore
+from fontTools import subset  # type: ignore
+from fontTools.ttLib import ttFont  # type: ignore
+from fontTools.ttLib.tables import ttProgram  # type: ignore
+import xgridfit.xgridfit as xgf  # type: ignore
+from xgridfit.version import __version__ as xgf_version  # type: ignore
+from xgridfit.ygridfit import ygridfit_parse_obj  # type: ignore
+from .fontBuffer import fontBuffer
+
+# This module does what xgridfit's compile_list does, but a glyph at a
+# time, remembering what it has already compiled. A glyph's program depends
+# only on its own source and on these font-level sections, so a hash of
+# those is enough to tell whether a cached program is still good.
+
+GLYPH_DEPENDENCIES = ["cvt", "functions", "macros", "defaults"]
+
+FONT_PROGRAM_DEPENDENCIES = [
+    "cvt",
+    "functions",
+    "macros",
+    "defaults",
+    "prep",
+    "cvar",
+    "masters",
+]
+
+NS = {
+    "xgf": "http://xgridfit.sourceforge.net/Xgridfit2",
+    "xi": "http://www.w3.org/2001/XInclude",
+    "xsl": "http://www.w3.org/1999/XSL/Transform",
+}
+
+MIN_MAX_INSTRUCTIONS = 200
+
+
+class compileCancelled(Exception):
+    """Raised when the caller of ygProgramCache.compile_list asks for the
+    build to stop.
+    """
+
+    pass
+
+
+def _feed(h: Any, obj: Any) -> None:
+    """Feeds a canonical representation of a chunk of ygt source to a hash
+    object. "parent" keys (back-references added by ygGlyph) are skipped,
+    and dict keys are sorted, so that equivalent sources hash the same.
+    """
+    if isinstance(obj, dict):
+        h.update(b"{")
+        for k in sorted(obj, key=str):
+            if k == "parent":
+                continue
+            h.update(repr(k).encode("utf-8"))
+            h.update(b":")
+            _feed(h, obj[k])
+            h.update(b",")
+        h.update(b"}")
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"[")
+        for o in obj:
+            _feed(h, o)
+            h.update(b",")
+        h.update(b"]")
+    else:
+        h.update(repr(obj).encode("utf-8"))
+
+
+def source_digest(obj: Any) -> str:
+    """Returns a hex digest of any part of a ygt source."""
+    h = hashlib.blake2b(digest_size=16)
+    _feed(h, obj)
+    return h.hexdigest()
+
+
+def sections_digest(source: dict, sections: list) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for s in sections:
+        h.update(s.encode("utf-8"))
+        if s in source:
+            _feed(h, source[s])
+        else:
+            h.update(b"None")
+    return h.hexdigest()
+
+
+def glyph_digest(source: dict, gname: str, deps_digest: str) -> str:
+    """The key for a glyph's compiled program: its own source plus the
+    digest of the font-level sections it depends on.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(deps_digest.encode("utf-8"))
+    h.update(gname.encode("utf-8"))
+    try:
+        _feed(h, source["glyphs"][gname])
+    except KeyError:
+        h.update(b"None")
+    return h.hexdigest()
+
+
+class ygFontProgram:
+    """The font-level output of a compile: cvt, cvar, fpgm and prep, plus the
+    numbers that go into maxp.
+    """
+
+    def __init__(
+        self,
+        cvt_list: list,
+        tuple_store: Optional[list],
+        fpgm_code: str,
+        prep_code: str,
+        max_function: int,
+    ) -> None:
+        self.cvt_list = cvt_list
+        self.tuple_store = tuple_store
+        self.fpgm_code = fpgm_code
+        self.prep_code = prep_code
+        self.max_function = max_function
+
+    def install(self, font: ttFont.TTFont) -> None:
+        for t in ["prep", "fpgm", "cvt "]:
+            if t in font:
+                del font[t]
+        xgf.install_cvt(font, self.cvt_list, 0)
+        if self.tuple_store != None:
+            xgf.install_cvar(font, self.tuple_store, False, 0)
+        font["maxp"].maxTwilightPoints = 25
+        font["maxp"].maxStorage = 64
+        font["maxp"].maxStackElements = 256
+        font["maxp"].maxFunctionDefs = self.max_function
+        font["head"].flags |= 0b0000000000001000
+        xgf.install_functions(font, self.fpgm_code, 0)
+        xgf.install_prep(font, self.prep_code, False, True)
+
+
+class ygXgfTransform:
+    """Wraps xgridfit's parse step and XSLT transform for one source and a
+    list of glyphs.
+    """
+
+    def __init__(self, font: ttFont.TTFont, source: dict, glyph_list: list) -> None:
+        self.failed: list = []
+        self.glyph_list = list(glyph_list)
+        if len(self.glyph_list) > 0:
+            self.xgffile = ygridfit_parse_obj(source, glyph_list=self.glyph_list)
+        else:
+            # With an empty glyph_list, ygridfit_parse_obj would parse every
+            # glyph in the source. We only want the font-level code.
+            self.xgffile = ygridfit_parse_obj(
+                {k: v for k, v in source.items() if k != "glyphs"}
+            )
+        self.xslfile = etree.parse(xgf.get_file_path("XSL/xgridfit-ft.xsl"))
+        self.etransform = etree.XSLT(self.xslfile)
+        if len(self.glyph_list) > 0:
+            coordinate_index, bad = xgf.make_coordinate_index(self.glyph_list, font)
+            self.failed.extend(bad)
+            bad = xgf.coordinates_to_points(
+                self.glyph_list, self.xgffile, coordinate_index, NS
+            )
+            self.failed.extend(bad)
+        self._safe_calls: Optional[list] = None
+
+    def safe_calls(self) -> list:
+        if self._safe_calls == None:
+            self._safe_calls = literal_eval(
+                str(self.etransform(self.xgffile, **{"stack-safe-list": "'yes'"}))
+            )
+        return self._safe_calls  # type: ignore
+
+    def font_program(self) -> ygFontProgram:
+        cvt_list = str(self.etransform(self.xgffile, **{"get-cvt-list": "'yes'"}))
+        cvt_list = literal_eval("[" + cvt_list + "]")
+        tuple_store = None
+        cvar_count = len(self.xgffile.xpath("/xgf:xgridfit/xgf:cvar", namespaces=NS))
+        if cvar_count > 0:
+            tuple_store = literal_eval(
+                str(self.etransform(self.xgffile, **{"get-cvar": "'yes'"}))
+            )
+        predef_functions = int(
+            self.xslfile.xpath(
+                "/xsl:stylesheet/xsl:variable[@name='predefined-functions']",
+                namespaces=NS,
+            )[0].attrib["select"]
+        )
+        max_function = int(
+            self.etransform(self.xgffile, **{"function-count": "'yes'"})
+        )
+        return ygFontProgram(
+            cvt_list,
+            tuple_store,
+            str(self.etransform(self.xgffile, **{"fpgm-only": "'yes'"})),
+            str(self.etransform(self.xgffile, **{"prep-only": "'yes'"})),
+            max_function + predef_functions,
+        )
+
+    def no_compact_list(self) -> list:
+        ncl = str(self.etransform(self.xgffile, **{"get-no-compact-list": "'yes'"}))
+        return ncl.split(" ")
+
+    def glyph_assembly(self, gname: str, compact: bool = False) -> str:
+        g_inst = str(self.etransform(self.xgffile, singleGlyphId="'" + gname + "'"))
+        if compact:
+            g_inst = xgf.compact_instructions(g_inst, self.safe_calls())
+        return g_inst
+
+
+def assemble(asm: str) -> bytes:
+    p = ttProgram.Program()
+    p.fromAssembly(asm)
+    return p.getBytecode()
+
+
+def install_bytecode(font: ttFont.TTFont, gname: str, bytecode: bytes) -> None:
+    g = font["glyf"][gname]
+    g.program = ttProgram.Program()
+    g.program.fromBytecode(bytecode)
+
+
+def max_instructions(font: ttFont.TTFont) -> int:
+    """Computes what xgridfit keeps in its maxInstructions global: the
+    size of the longest glyph program, but no less than 200.
+    """
+    m = MIN_MAX_INSTRUCTIONS
+    glyf = font["glyf"]
+    for gname in glyf.keys():
+        g = glyf[gname]
+        if hasattr(g, "program"):
+            m = max(m, len(g.program.getBytecode()))
+    return m
+
+
+class ygSubsetFont:
+    """A subsetted copy of the font made for one list of glyphs, along with a
+    record of which compiled programs have been installed in it.
+    """
+
+    def __init__(self, font: ttFont.TTFont, glyph_list: list) -> None:
+        self.font = font
+        options = subset.Options(glyph_names=True)
+        options.layout_features = ["*"]
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(glyphs=glyph_list)
+        subsetter.subset(self.font)
+        xgf.wipe_font(self.font)
+        self.glyph_id = {g: self.font.getGlyphID(g) for g in glyph_list}
+        # gname -> key of the program installed for that glyph.
+        self.installed: dict = {}
+        self.font_program_key: Optional[str] = None
+        self.has_own_cvar = False
+
+
+class ygProgramCache:
+    """A content-addressed cache of compiled glyph programs for the preview.
+
+    Compiled bytecode is stored under a digest of the glyph's source and of
+    the font-level sections it depends on, so only glyphs whose source (or
+    whose dependencies) have changed since the last preview are recompiled.
+    A few subsetted fonts are kept as well, keyed by glyph list, so that the
+    expensive subsetting step is skipped while the user keeps editing the
+    same glyph or previewing the same string: cached programs are simply
+    spliced into the existing subset font.
+
+    A cache belongs to one font, and must be used from only one thread at a
+    time.
+    """
+
+    def __init__(self, max_programs: int = 5000, max_subset_fonts: int = 4) -> None:
+        self.max_programs = max_programs
+        self.max_subset_fonts = max_subset_fonts
+        self.programs: OrderedDict = OrderedDict()
+        self.font_programs: dict = {}
+        self.subset_fonts: OrderedDict = OrderedDict()
+        self.last_keys: dict = {}
+        self.last_font_program_key: Optional[str] = None
+
+    def clear(self) -> None:
+        self.programs.clear()
+        self.font_programs.clear()
+        self.subset_fonts.clear()
+
+    def _subset_font(self, font: fontBuffer, glyph_list: list) -> ygSubsetFont:
+        k = tuple(sorted(glyph_list))
+        if k in self.subset_fonts:
+            self.subset_fonts.move_to_end(k)
+            return self.subset_fonts[k]
+        sf = ygSubsetFont(font.copy(), glyph_list)
+        self.subset_fonts[k] = sf
+        while len(self.subset_fonts) > self.max_subset_fonts:
+            self.subset_fonts.popitem(last=False)
+        return sf
+
+    def _store(self, key: str, bytecode: bytes) -> None:
+        self.programs[key] = bytecode
+        while len(self.programs) > self.max_programs:
+            self.programs.popitem(last=False)
+
+    def compile_list(
+        self,
+        font: fontBuffer,
+        source: dict,
+        glyph_list: list,
+        cancelled: Optional[Callable[[], bool]] = None,
+        program_list: Optional[list] = None,
+    ) -> Tuple[SpooledTemporaryFile, dict, list]:
+        """A replacement for xgridfit's compile_list. Returns the same things:
+        a temporary file containing a subsetted, hinted font, a name-to-gid
+        dict, and a list of glyphs that failed to compile.
+
+        cancelled is polled between glyphs; if it returns True, the build
+        stops with compileCancelled. Programs compiled before that point
+        stay in the cache.
+
+        program_list, if given, names the glyphs (among those in glyph_list)
+        that get programs; the rest are in the font, but unhinted. Compiling
+        a glyph with no source still costs something, so when building a
+        whole font, pass the names of the hinted glyphs here.
+
+        Afterward, last_keys holds the program key of each glyph in
+        program_list, and last_font_program_key the key of the font
+        program, so that a caller can tell what has changed since an
+        earlier build.
+        """
+
+        def check_cancelled() -> None:
+            if cancelled != None and cancelled():
+                raise compileCancelled()
+
+        glyph_list = list(dict.fromkeys(glyph_list))
+        if program_list == None:
+            program_list = glyph_list
+        else:
+            in_font = set(glyph_list)
+            program_list = [g for g in dict.fromkeys(program_list) if g in in_font]
+        failed: list = []
+        deps_digest = sections_digest(source, GLYPH_DEPENDENCIES)
+        fp_key = sections_digest(source, FONT_PROGRAM_DEPENDENCIES)
+        keys = {g: glyph_digest(source, g, deps_digest) for g in program_list}
+        dirty = [g for g in program_list if not keys[g] in self.programs]
+        for g in program_list:
+            if keys[g] in self.programs:
+                self.programs.move_to_end(keys[g])
+        sf = self._subset_font(font, glyph_list)
+
+        # Compile whatever isn't in the cache. The subset font has the same
+        # outlines as the original, so it will do for looking up coordinates.
+        if len(dirty) > 0 or not fp_key in self.font_programs:
+            xt = ygXgfTransform(sf.font, source, dirty)
+            failed.extend(xt.failed)
+            if not fp_key in self.font_programs:
+                self.font_programs[fp_key] = xt.font_program()
+            for g in xt.glyph_list:
+                check_cancelled()
+                if g in failed:
+                    continue
+                try:
+                    self._store(keys[g], assemble(xt.glyph_assembly(g)))
+                except Exception as e:
+                    print(e)
+                    failed.append(g)
+        check_cancelled()
+
+        # Splice programs into the subset font.
+        if sf.font_program_key != fp_key:
+            fp = self.font_programs[fp_key]
+            if fp.tuple_store == None and sf.has_own_cvar:
+                del sf.font["cvar"]
+            fp.install(sf.font)
+            sf.has_own_cvar = fp.tuple_store != None
+            sf.font_program_key = fp_key
+        for g in glyph_list:
+            if g in failed or not g in keys:
+                if sf.installed.get(g) != None:
+                    install_bytecode(sf.font, g, b"")
+                    sf.installed[g] = None
+            elif sf.installed.get(g) != keys[g]:
+                install_bytecode(sf.font, g, self.programs[keys[g]])
+                sf.installed[g] = keys[g]
+        sf.font["maxp"].maxSizeOfInstructions = max_instructions(sf.font) + 50
+
+        tf = SpooledTemporaryFile(max_size=1000000, mode="b")
+        sf.font.save(tf, 1)
+        tf.seek(0)
+        self.last_keys = keys
+        self.last_font_program_key = fp_key
+        return tf, dict(sf.glyph_id), failed
+
+
+#
+# Exporting whole fonts
+#
+
+# Below this many glyphs, starting worker processes costs more than it saves.
+MIN_GLYPHS_PER_WORKER = 100
+
+_worker_font: Optional[ttFont.TTFont] = None
+_worker_source: dict = {}
+
+
+def compile_glyphs(
+    font: ttFont.TTFont, source: dict, glyph_list: list
+) -> Tuple[dict, list]:
+    """Compiles glyph programs the way xgridfit's run function does,
+    compacting instructions unless a glyph asks otherwise. Returns a dict
+    of glyph name to bytecode and a list of glyphs that failed.
+    """
+    programs = {}
+    xt = ygXgfTransform(font, source, glyph_list)
+    failed = list(xt.failed)
+    no_compact = xt.no_compact_list()
+    for g in xt.glyph_list:
+        try:
+            programs[g] = assemble(
+                xt.glyph_assembly(g, compact=not g in no_compact)
+            )
+        except Exception as e:
+            print(e)
+            failed.append(g)
+    return programs, failed
+
+
+def _init_worker(font_data: bytes, source: dict) -> None:
+    global _worker_font, _worker_source
+    _worker_font = fontBuffer(font_data).copy()
+    _worker_source = source
+
+
+def _compile_shard(glyph_sources: dict) -> Tuple[dict, list]:
+    source = dict(_worker_source)
+    source["glyphs"] = glyph_sources
+    return compile_glyphs(_worker_font, source, list(glyph_sources.keys()))  # type: ignore
+
+
+def _shards(glyph_list: list, count: int) -> list:
+    size = max(1, -(-len(glyph_list) // count))
+    return [glyph_list[i : i + size] for i in range(0, len(glyph_list), size)]
+
+
+def default_worker_count(glyph_count: int) -> int:
+    cpus = os.cpu_count() or 1
+    return max(1, min(cpus, glyph_count // MIN_GLYPHS_PER_WORKER))
+
+
+#
+# Build manifests for incremental export
+#
+
+MANIFEST_FORMAT = 1
+
+MANIFEST_SECTIONS = ["cvt", "cvar", "prep", "functions", "macros", "defaults", "masters"]
+
+
+def manifest_path(output_font: str) -> str:
+    return os.path.splitext(output_font)[0] + ".ygt-build.json"
+
+
+class ygBuildManifest:
+    """A record of an export, saved next to the output font: digests of the
+    input font and of the font-level sections of the source, and for each
+    glyph a digest of its source and the bytecode compiled from it.
+
+    When nothing font-level has changed since the last export, a glyph
+    whose source digest is unchanged can take its program from here
+    instead of being compiled again.
+    """
+
+    def __init__(self, font: fontBuffer, source: dict) -> None:
+        self.font_digest = hashlib.blake2b(font.data, digest_size=16).hexdigest()
+        self.sections = {
+            k: source_digest(source[k]) if k in source else None
+            for k in MANIFEST_SECTIONS
+        }
+        self.glyphs: dict = {}
+        for g, gsource in source.get("glyphs", {}).items():
+            self.glyphs[g] = {"source": source_digest(gsource), "program": None}
+
+    def _globals(self) -> dict:
+        return {
+            "format": MANIFEST_FORMAT,
+            "xgridfit": xgf_version,
+            "font": self.font_digest,
+            "sections": self.sections,
+        }
+
+    def reusable_programs(self, filename: str) -> dict:
+        """Reads the manifest from a previous build and returns the programs
+        that can be used in this one, as a dict of glyph name to bytecode.
+        """
+        try:
+            with open(filename, "r") as f:
+                old = json.load(f)
+            if old["globals"] != self._globals():
+                return {}
+            result = {}
+            for g, entry in self.glyphs.items():
+                old_entry = old["glyphs"].get(g)
+                if (
+                    old_entry != None
+                    and old_entry["source"] == entry["source"]
+                    and old_entry["program"] != None
+                ):
+                    result[g] = base64.b64decode(old_entry["program"])
+            return result
+        except Exception:
+            return {}
+
+    def set_programs(self, programs: dict) -> None:
+        for g, bytecode in programs.items():
+            if g in self.glyphs:
+                self.glyphs[g]["program"] = base64.b64encode(bytecode).decode("ascii")
+
+    def save(self, filename: str) -> None:
+        with open(filename, "w") as f:
+            json.dump({"globals": self._globals(), "glyphs": self.glyphs}, f)
+
+
+def export_font(
+    font: fontBuffer,
+    source: dict,
+    output_font: str,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+    incremental: bool = True,
+) -> list:
+    """Compiles all the hints in source into font and saves the result as
+    output_font (a .ttf file). Returns a list of glyphs that failed to
+    compile.
+
+    The glyphs section is divided into shards, each compiled in a separate
+    process against the same font-level code; then the programs are merged
+    into one font. The result is the same as from xgridfit's run function
+    (not in merge-mode), which is still used for everything this can't do.
+
+    If incremental is True, a build manifest (see ygBuildManifest) is read
+    from beside output_font, and only glyphs changed since the last export
+    are compiled. A new manifest is written after the font is saved.
+
+    progress, if given, is called with the number of glyphs finished and
+    the total number.
+    """
+    glyph_sources = source.get("glyphs", {})
+    glyph_list = list(glyph_sources.keys())
+    total = len(glyph_list)
+    global_source = {k: v for k, v in source.items() if k != "glyphs"}
+
+    manifest = ygBuildManifest(font, source)
+    programs: dict = {}
+    if incremental:
+        programs = manifest.reusable_programs(manifest_path(output_font))
+    dirty = [g for g in glyph_list if not g in programs]
+    if workers == None:
+        workers = default_worker_count(len(dirty))
+
+    this_font = font.copy()
+    xgf.wipe_font(this_font)
+    ygXgfTransform(this_font, global_source, []).font_program().install(this_font)
+
+    failed: list = []
+    done = total - len(dirty)
+    if progress != None:
+        progress(done, total)
+    # Smaller shards than strictly necessary, so that progress is reported
+    # more often and slow shards don't hold up the end of the build.
+    shards = _shards(dirty, workers * 4)
+    if workers <= 1:
+        for shard in shards:
+            p, f = compile_glyphs(
+                this_font, dict(global_source, glyphs=glyph_sources), list(shard)
+            )
+            programs.update(p)
+            failed.extend(f)
+            done += len(shard)
+            if progress != None:
+                progress(done, total)
+    else:
+        # Spawn, don't fork: we may be running in a thread of a Qt program.
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(font.tobytes(), global_source),
+        ) as executor:
+            futures = {
+                executor.submit(
+                    _compile_shard, {g: glyph_sources[g] for g in shard}
+                ): len(shard)
+                for shard in shards
+            }
+            for future in as_completed(futures):
+                p, f = future.result()
+                programs.update(p)
+                failed.extend(f)
+                done += futures[future]
+                if progress != None:
+                    progress(done, total)
+
+    for g in glyph_list:
+        if g in programs:
+            install_bytecode(this_font, g, programs[g])
+    # Not xgridfit's maxInstructions, which is a running maximum over
+    # everything compiled in this process.
+    this_font["maxp"].maxSizeOfInstructions = max_instructions(this_font) + 50
+    with this_font as f:
+        f.save(output_font, 1)
+    if incremental:
+        manifest.set_programs({g: p for g, p in programs.items() if not g in failed})
+        try:
+            manifest.save(manifest_path(output_font))
+        except OSError as e:
+            print(e)
+    order = {g: i for i, g in enumerate(glyph_list)}
+    return sorted(failed, key=lambda g: order.get(g, total))
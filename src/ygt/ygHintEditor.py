@@ -2,6 +2,8 @@ from typing import Any, Union, Optional, List, Dict, Callable, Tuple
 import sys
 import uuid
 import copy
+from collections import OrderedDict
+from math import floor, ceil
 from .macfuncDialog import macfuncDialog
 from .makeCVDialog import makeCVDialog
 from .ygModel import (
@@ -15,6 +17,8 @@ from .ygModel import (
     ygFunction,
     ygMacro,
     ygGlyph,
+    ygGlyphHistory,
+    undo_stack_size,
     unicode_cat_names,
 )
 from PyQt6.QtCore import (
@@ -28,6 +32,7 @@ from PyQt6.QtCore import (
     QLineF,
     pyqtSlot,
     QObject,
+    QTimer,
 )
 from PyQt6.QtGui import (
     QPainterPath,
@@ -37,6 +42,8 @@ from PyQt6.QtGui import (
     QPolygonF,
     QAction,
     QPainter,
+    QPixmap,
+    QTransform,
     QGuiApplication,
 )
 from PyQt6.QtWidgets import (
@@ -136,6 +143,16 @@ GLYPH_WIDGET_MARGIN = 50
 POINT_ONCURVE_DIA = 8
 POINT_OFFCURVE_DIA = 6
 HINT_BUTTON_DIA = 6
+# The largest pixmap (in device pixels) in which ygGlyphScene will cache
+# the glyph outline. A bigger outline is drawn directly.
+OUTLINE_CACHE_MAX_PIXELS = 4096 * 4096
+# Size (in scene coordinates) of the cells of ygSpatialIndex.
+SPATIAL_INDEX_CELL_SIZE = 64
+# How many recently visited glyphs ygGlyphView prepares in advance (besides
+# the next and previous ones), and how long (ms) it waits after switching
+# glyphs before preparing each one.
+PREFETCH_RECENT = 4
+PREFETCH_DELAY = 20
 
 PTFILL_ANCHOR_TOUCH_COLOR = QColor(255, 233, 236, 128)
 PTFILL_ANCHOR_TOUCH_DARK = QColor(170, 51, 106, 192)
@@ -1261,7 +1278,7 @@ class ygSelection(QObject):
         """This method of selecting doesn't work on hints."""
         if not add_to_selection:
             self._cancel_selection()
-        for ptv in self.yg_glyph_scene.yg_point_view_list:
+        for ptv in self.yg_glyph_scene.point_index.in_rect(rect):
             if ptv.isVisible() and rect.contains(ptv.glocation):
                 ptv.yg_select()
                 self.selected_objects.append(ptv)
@@ -1271,7 +1288,7 @@ class ygSelection(QObject):
 
     def _toggle_rect(self, rect: QRectF) -> None:
         """This method of selecting doesn't work on hints."""
-        for ptv in self.yg_glyph_scene.yg_point_view_list:
+        for ptv in self.yg_glyph_scene.point_index.in_rect(rect):
             if ptv.isVisible() and rect.contains(ptv.glocation):
                 if ptv.selected():
                     ptv.yg_unselect()
@@ -1441,6 +1458,115 @@ class SelectionRect(QGraphicsRectItem):
         self.setRect(qr)
 
 
+class ygSpatialIndex:
+    """A grid of buckets over the scene, for finding the items that may be
+    at a point or in a rect without testing every item in the glyph. Each
+    item is entered, with a rect that must enclose every place where it
+    can be hit, in the bucket for each cell that rect overlaps.
+
+    Lookups return candidates, in the order in which they were inserted;
+    the caller still has to test them.
+    """
+
+    def __init__(self, cell_size: int = SPATIAL_INDEX_CELL_SIZE) -> None:
+        self.cell_size = cell_size
+        self.items: list = []
+        # (column, row) -> list of positions in self.items, in order.
+        self.buckets: dict = {}
+        # Items without a rect, which are candidates for every lookup.
+        self.unbounded: list = []
+
+    def _cells(self, rect: QRectF) -> Tuple[int, int, int, int]:
+        c = self.cell_size
+        return (
+            floor(rect.left() / c),
+            floor(rect.top() / c),
+            floor(rect.right() / c),
+            floor(rect.bottom() / c),
+        )
+
+    def insert(self, item: Any, rect: Optional[QRectF]) -> None:
+        i = len(self.items)
+        self.items.append(item)
+        if rect == None:
+            self.unbounded.append(i)
+            return
+        x0, y0, x1, y1 = self._cells(rect)
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                self.buckets.setdefault((x, y), []).append(i)
+
+    def _result(self, ii: Any) -> list:
+        if len(self.unbounded):
+            ii = set(ii) | set(self.unbounded)
+        return [self.items[i] for i in sorted(ii)]
+
+    def at(self, p: QPointF) -> list:
+        c = self.cell_size
+        return self._result(
+            self.buckets.get((floor(p.x() / c), floor(p.y() / c)), [])
+        )
+
+    def in_rect(self, rect: QRectF) -> list:
+        x0, y0, x1, y1 = self._cells(rect.normalized())
+        ii: set = set()
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                ii.update(self.buckets.get((x, y), []))
+        return self._result(ii)
+
+
+def _hit_rect(item: Any) -> Optional[QRectF]:
+    """The rect (in the coordinates that contains() is called with) outside
+    of which a point view or hint view can't be hit. It has a little room to
+    spare, in case a pen gets wider.
+    """
+    if type(item) is ygPointView:
+        r = item.mapToScene(item.boundingRect()).boundingRect()
+        return r.adjusted(-2, -2, 2, 2)
+    if isinstance(item, ygHintView):
+        parts = item.graphical_hint
+    elif isinstance(item, ygPointCollectionView):
+        parts = item.point_markers + item.borders
+    else:
+        return item.boundingRect()
+    result = None
+    for g in parts:
+        r = _hit_rect(g)
+        if r == None:
+            return None
+        result = r if result == None else result.united(r)
+    return None if result == None else result.adjusted(-2, -2, 2, 2)
+
+
+def _frozen(obj: Any) -> Any:
+    """A hashable copy of (part of) a hint's source, for comparing hints
+    by content.
+    """
+    if isinstance(obj, dict):
+        return tuple(sorted((k, _frozen(v)) for k, v in obj.items()))
+    if isinstance(obj, list):
+        return ("list", tuple(_frozen(v) for v in obj))
+    return (type(obj).__name__, obj)
+
+
+def _hint_key(hint: ygHint) -> tuple:
+    """Two hints with the same key are drawn the same way (in the same
+    glyph, at the same zoom). The parent (a back reference) and the
+    child hints are left out.
+    """
+    return (
+        hint.nohint,
+        tuple(
+            sorted(
+                (k, _frozen(v))
+                for k, v in hint.source.items()
+                if not k in ["parent", "points"]
+            )
+        ),
+    )
+
+
 class ygGlyphScene(QGraphicsScene):
     """The workspace.
 
@@ -1483,6 +1609,19 @@ class ygGlyphScene(QGraphicsScene):
         self.yg_point_view_list: list = []
         self.yg_set_view_dict = {}
         self.yg_hint_view_list: list = []
+        # Spatial indexes of the point views and the hint views, for
+        # hit-testing. Built when needed; set to None when the points move
+        # (on zooming) or the hints are replaced.
+        self._point_index: Optional[ygSpatialIndex] = None
+        self._hint_index: Optional[ygSpatialIndex] = None
+        # The hint views installed by install_hints, by _hint_key, and
+        # what they were drawn for (see _hint_view_context).
+        self._hint_views: dict = {}
+        self._hint_context: Optional[tuple] = None
+        # The glyph outline, drawn into a pixmap (see _outline_layer): a
+        # tuple of the key it was drawn for and the result of
+        # _draw_outline_layer. Set to None when the outline is scaled.
+        self._outline_cache: Optional[tuple] = None
         super(ygGlyphScene, self).__init__()
         self.cv_error_msg = "Error while looking for a control value."
         self.set_dict = {}
@@ -1678,6 +1817,7 @@ class ygGlyphScene(QGraphicsScene):
         self.setSceneRect(QRectF(0, 0, self.canvas_size[0], self.canvas_size[1]))
         self.xTranslate = self.canvas_size[2]
         self.yTranslate = self.canvas_size[3]
+        self._point_index = None
         for c_index, cc in enumerate(c):
             try:
                 p = self.yg_point_view_list[c_index]
@@ -1697,6 +1837,7 @@ class ygGlyphScene(QGraphicsScene):
             self.path = QPainterPath()
             self.qt_pen = QtPen(glyph_set, path=self.path)
             self.yg_glyph.ft_glyph.draw(self.qt_pen, glyph_table)
+        self._outline_cache = None
 
     def _calc_canvas_size(self) -> Tuple[int, int, int, int]:
         """This calculates a canvas that will do for the entire font. The result
@@ -1779,41 +1920,96 @@ class ygGlyphScene(QGraphicsScene):
                 self.owner.centerOn(self.center_x, self.mid_point_y())
 
         if self.yg_glyph.is_composite:
-            pass
-        else:
-            painter.scale(1.0, -1.0)
-            painter.translate(QPointF(self.xTranslate, self.yTranslate * -1))
-
-        pen = painter.pen()
-
-        if self.yg_glyph.is_composite:
-            pass
             # For now, anyway, we're not displaying anything for composites in the
             # main editing window. This should change, but don't get elaborate: this
             # display is of much less interest than (e.g.) the preview.
-        else:
-            if self.preferences["show_metrics"]:
-                pen.setWidth(1)
-                if self.dark_theme:
-                    pen.setColor(QColor(220, 220, 220, 75))
-                    HINT_COLOR = _HINT_DARK
-                    SELECTED_HINT_COLOR = _SELECTED_HINT_DARK
-                else:
-                    pen.setColor(QColor(50, 50, 50, 50))
-                    HINT_COLOR = _HINT_COLOR
-                    SELECTED_HINT_COLOR = _SELECTED_HINT_COLOR
-                painter.setPen(pen)
-                painter.drawLine(
-                    QLine(-abs(self.xTranslate), 0, round(self.width()), 0)
-                )
-                ya = -abs(self.yTranslate)
-                painter.drawLine(QLine(0, ya, 0, round(self.height())))
-                painter.drawLine(QLine(self.adv, ya, self.adv, round(self.height())))
+            return
+
+        layer = self._outline_layer(painter)
+
+        painter.save()
+        painter.scale(1.0, -1.0)
+        painter.translate(QPointF(self.xTranslate, self.yTranslate * -1))
+
+        pen = painter.pen()
 
+        if self.preferences["show_metrics"]:
+            pen.setWidth(1)
+            if self.dark_theme:
+                pen.setColor(QColor(220, 220, 220, 75))
+                HINT_COLOR = _HINT_DARK
+                SELECTED_HINT_COLOR = _SELECTED_HINT_DARK
+            else:
+                pen.setColor(QColor(50, 50, 50, 50))
+                HINT_COLOR = _HINT_COLOR
+                SELECTED_HINT_COLOR = _SELECTED_HINT_COLOR
+            painter.setPen(pen)
+            painter.drawLine(QLine(-abs(self.xTranslate), 0, round(self.width()), 0))
+            ya = -abs(self.yTranslate)
+            painter.drawLine(QLine(0, ya, 0, round(self.height())))
+            painter.drawLine(QLine(self.adv, ya, self.adv, round(self.height())))
+
+        if layer == None:
             pen.setWidth(CHAR_OUTLINE_WIDTH)
             pen.setColor(QColor("gray"))
             painter.setPen(pen)
             painter.drawPath(self.path)
+        painter.restore()
+        if layer != None and layer[0] != None:
+            painter.drawPixmap(layer[1], layer[0])
+
+    def _outline_layer(self, painter: QPainter) -> Optional[tuple]:
+        """Returns the glyph outline drawn into a pixmap, so that the path
+        isn't stroked again every time the background is painted (e.g.
+        while scrolling). The pixmap is kept until the glyph is scaled, or
+        the zoom, the theme, the metrics setting or the device's pixel
+        ratio changes.
+
+        Returns a tuple of the pixmap (None for an empty outline) and its
+        position in the scene; or None if the outline should be drawn
+        directly (if the view is scaled or rotated, or the pixmap would be
+        too big).
+        """
+        dpr = painter.device().devicePixelRatioF()
+        show_metrics = self.preferences["show_metrics"]
+        key = (self.zoom_factor, self.dark_theme, show_metrics, dpr)
+        if self._outline_cache == None or self._outline_cache[0] != key:
+            self._outline_cache = (key, self._draw_outline_layer(painter, dpr))
+        transform = painter.transform()
+        if transform.isScaling() or transform.isRotating():
+            return None
+        return self._outline_cache[1]
+
+    def _draw_outline_layer(self, painter: QPainter, dpr: float) -> Optional[tuple]:
+        """Draws the outline into a new pixmap, with the painter's render
+        hints. Returns the pixmap and its position in the scene (see
+        _outline_layer).
+        """
+        t = QTransform()
+        t.scale(1.0, -1.0)
+        t.translate(self.xTranslate, self.yTranslate * -1)
+        if self.path.isEmpty():
+            return None, QPointF(0, 0)
+        w = CHAR_OUTLINE_WIDTH + 1
+        r = t.mapRect(self.path.boundingRect()).adjusted(-w, -w, w, w)
+        origin = QPointF(floor(r.left()), floor(r.top()))
+        width = ceil((ceil(r.right()) - origin.x()) * dpr)
+        height = ceil((ceil(r.bottom()) - origin.y()) * dpr)
+        if width * height > OUTLINE_CACHE_MAX_PIXELS:
+            return None
+        pixmap = QPixmap(width, height)
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        p = QPainter(pixmap)
+        p.setRenderHints(painter.renderHints())
+        p.translate(-origin)
+        p.setTransform(t, True)
+        pen = QPen(QColor("gray"))
+        pen.setWidth(CHAR_OUTLINE_WIDTH)
+        p.setPen(pen)
+        p.drawPath(self.path)
+        p.end()
+        return pixmap, origin
 
     #
     # Editing slots
@@ -2083,45 +2279,113 @@ class ygGlyphScene(QGraphicsScene):
                     self.yg_set_view_dict[s[0]].setVisible(True)
                     self.yg_set_view_dict[s[0]].label.show()
 
+    def _hint_view_context(self) -> tuple:
+        """What all the hint views depend on besides their own hints: if
+        this changes, they must all be made again.
+        """
+        return (
+            self.zoom_factor,
+            self.yg_glyph.axis,
+            _frozen(self.yg_glyph.gsource.get("names")),
+        )
+
+    def _remove_hint_view(self, h: ygHintView) -> None:
+        if h.scene() is self:
+            h._remove_labels()
+            self.removeItem(h)
+        if h in self.yg_selection.selected_objects:
+            self.yg_selection.selected_objects.remove(h)
+
     def install_hints(self, hint_list: List[ygHint]) -> None:
         """Installs a collection of hints sent from the model.
 
+        The list from the model is compared with the hints already on
+        display: a view is kept for each hint that is unchanged, and only
+        the views for hints that have been added, changed or deleted are
+        made or removed. Everything is made again when the zoom, the axis
+        or the point names have changed.
+
         Parameters:
         hint_list: All the hints for either the y or the x axis
         for this glyph, in a list.
 
         """
-        # Remove the old hints (destroying the ygHintView wrappers) and empty
-        # out the list storing them.
-        for h in self.yg_hint_view_list:
-            if h in self.items():
-                h._remove_labels()
-                self.removeItem(h)
-        for s in self.yg_set_view_dict.values():
-            s._remove_labels()
-            self.removeItem(s)
-        self.untouch_all()
-        self.yg_hint_view_list.clear()
-        self.yg_set_view_dict.clear()
-        # The hints we get from the model are ygModel.ygHint objects, using
-        # any legal Xgridfit identifier for the points. Wrap each one in a
-        # ygHintView object.
+        context = self._hint_view_context()
+        rebuild = context != self._hint_context
+        self._hint_context = context
+        old_views = self._hint_views
+        # Sources of the selected hints whose views are removed: the new
+        # view of a hint that has changed is selected in its place.
+        selected_sources = []
+        if rebuild:
+            old_views = {}
+            for h in self.yg_hint_view_list:
+                if h.selected():
+                    selected_sources.append(h.yg_hint.source)
+                self._remove_hint_view(h)
+            for s in self.yg_set_view_dict.values():
+                self._remove_hint_view(s)
+            self.yg_set_view_dict.clear()
+            self.yg_hint_view_list.clear()
+            self._hint_index = None
+
+        # The hints we get from the model are ygModel.ygHint objects, made
+        # afresh each time. Match them to the existing views by content.
+        # An unchanged hint keeps its view (which is given the new ygHint);
+        # the rest are wrapped in new ygHintView objects below.
+        views: list = []
         for h in hint_list:
-            vh = self._make_visible_hint(h)
-            self.yg_hint_view_list.append(vh)
+            v = None
+            vv = old_views.get(_hint_key(h))
+            if vv:
+                v = vv.pop(0)
+                v.yg_hint = h
+                for g in v.graphical_hint:
+                    if hasattr(g, "yg_hint"):
+                        g.yg_hint = h
+            views.append(v)
+
+        # Remove the views of hints that have changed or gone.
+        for vv in old_views.values():
+            for v in vv:
+                if v.selected():
+                    selected_sources.append(v.yg_hint.source)
+                self._remove_hint_view(v)
+                self._hint_index = None
+
+        self.untouch_all()
+        self._hint_views = {}
+        for i, h in enumerate(hint_list):
+            v = views[i]
+            if v == None:
+                v = self._make_visible_hint(h)
+                views[i] = v
+                if any(h.source is s for s in selected_sources):
+                    v.yg_select()
+                    v._prepare_graphics()
+                    self.yg_selection.selected_objects.append(v)
+            elif v.yg_hint.hint_type != "nohint":
+                v._touch_all_points()
+            self._hint_views.setdefault(_hint_key(h), []).append(v)
+
         sets = self.yg_glyph.names.get_named_sets()
-        hints = self.yg_glyph.hints
         if len(sets) > 0:
             used_set_list = self.used_sets()
             for s in sets:
-                sv = self._make_visible_hint(
-                    ygHint(self.yg_glyph, {"ptid": s[1]}, nohint=True)
-                )
-                sv._set_name(s[0])
-                self.yg_set_view_dict[s[0]] = sv
+                sv = self.yg_set_view_dict.get(s[0])
+                if sv == None:
+                    sv = self._make_visible_hint(
+                        ygHint(self.yg_glyph, {"ptid": s[1]}, nohint=True)
+                    )
+                    sv._set_name(s[0])
+                    self.yg_set_view_dict[s[0]] = sv
                 if s[0] in used_set_list:
                     sv.setVisible(False)
                     sv.label.hide()
+                else:
+                    sv.setVisible(True)
+                    sv.label.show()
+        self.yg_hint_view_list = views + list(self.yg_set_view_dict.values())
         self.update()
         self.yg_selection.send_signal()
 
@@ -2198,6 +2462,24 @@ class ygGlyphScene(QGraphicsScene):
     # Utilities
     #
 
+    @property
+    def point_index(self) -> ygSpatialIndex:
+        """A spatial index of the point views (see ygSpatialIndex)."""
+        if self._point_index == None:
+            self._point_index = ygSpatialIndex()
+            for ptv in self.yg_point_view_index.values():
+                self._point_index.insert(ptv, _hit_rect(ptv))
+        return self._point_index
+
+    @property
+    def hint_index(self) -> ygSpatialIndex:
+        """A spatial index of the hint views (see ygSpatialIndex)."""
+        if self._hint_index == None:
+            self._hint_index = ygSpatialIndex()
+            for h in self.yg_hint_view_list:
+                self._hint_index.insert(h, _hit_rect(h))
+        return self._hint_index
+
     def _mouse_over_point(self, qp: QPoint) -> ygPointView:
         """In ygGlyphScene. Determines whether the mouse is positioned over a point.
 
@@ -2208,10 +2490,9 @@ class ygGlyphScene(QGraphicsScene):
         ygPointView if the mouse is over a point; otherwise None
 
         """
-        pt_keys = self.yg_point_view_index.keys()
-        for pk in pt_keys:
-            if self.yg_point_view_index[pk].contains(qp):
-                return self.yg_point_view_index[pk]
+        for ptv in self.point_index.at(qp):
+            if ptv.contains(qp):
+                return ptv
         return None
 
     def _mouse_over_hint(self, qp: QPointF) -> Optional[ygHintView]:
@@ -2223,7 +2504,7 @@ class ygGlyphScene(QGraphicsScene):
         Returns:
         ygHintView if the mouse is over a hint; otherwise None
         """
-        for h in self.yg_hint_view_list:
+        for h in self.hint_index.at(qp):
             if h.contains(qp):
                 return h
         return None
@@ -2506,6 +2787,7 @@ class ygGlyphScene(QGraphicsScene):
         else:
             raise Exception("Unknown hint type " + str(hint_type_num))
         self.yg_hint_view_list.append(yg_hint_view)
+        self._hint_index = None
         return yg_hint_view
 
     @pyqtSlot(dict)
@@ -3070,8 +3352,23 @@ class ygGlyphView(QGraphicsView):
         self.yg_glyph_scene = yg_glyph_scene
         self.yg_font = font
         self.preferences = preferences
-        self.visited_glyphs: Dict[str, ygGlyphScene] = {}
+        # Scenes of edited glyphs, least recently visited first. Beyond the
+        # number set in preferences, a scene is dropped and its glyph's undo
+        # history is kept in glyph_histories (see _trim_glyph_cache).
+        self.visited_glyphs: Dict[str, ygGlyphScene] = OrderedDict()
+        self.glyph_histories: Dict[str, ygGlyphHistory] = {}
+        # Scenes made in advance for the glyphs we are likely to go to next
+        # (see _schedule_prefetch), with the display settings they were made
+        # with.
+        self.prefetched: Dict[str, Tuple[ygGlyphScene, tuple]] = {}
+        self._prefetch_wanted: List[str] = []
+        self._recent_glyphs: List[str] = []
+        self._prefetch_timer = QTimer(self)
+        self._prefetch_timer.setSingleShot(True)
+        self._prefetch_timer.setInterval(PREFETCH_DELAY)
+        self._prefetch_timer.timeout.connect(self._prefetch_next)
         self.drag_mode_backup = QGraphicsView.DragMode.NoDrag
+        self._schedule_prefetch()
 
     #
     # Setup
@@ -3145,14 +3442,18 @@ class ygGlyphView(QGraphicsView):
         if font_viewer:
             font_viewer.set_current_glyph(self.yg_glyph_scene.yg_glyph.gname, False)
         self.yg_glyph_scene.reset_scale()
-        self.yg_glyph_scene.yg_glyph.cleanup_glyph()
-        # Store the current glyph if it is changed.
-        if not self.yg_glyph_scene.yg_glyph.undo_stack.isClean():
-            self.visited_glyphs[
-                self.yg_glyph_scene.yg_glyph.gname
-            ] = self.yg_glyph_scene
+        old_glyph = self.yg_glyph_scene.yg_glyph
+        old_glyph.cleanup_glyph()
+        # Store the current glyph if it has been edited.
+        if old_glyph.undo_stack.count() > 0:
+            self.visited_glyphs[old_glyph.gname] = self.yg_glyph_scene
+            self.visited_glyphs.move_to_end(old_glyph.gname)  # type: ignore
+        else:
+            # Nothing to undo: the stack needn't stay in the undo group.
+            self.preferences.top_window().remove_undo_stack(old_glyph.undo_stack)
         if gname in self.visited_glyphs:
             self.yg_glyph_scene = self.visited_glyphs[gname]
+            self.visited_glyphs.move_to_end(gname)  # type: ignore
             new_glyph = self.yg_glyph_scene.yg_glyph
             new_glyph.axis = self.preferences.top_window().current_axis
             # If we're returning to a glyph, we have to undo the cleanup
@@ -3160,10 +3461,24 @@ class ygGlyphView(QGraphicsView):
             new_glyph.undo_stack.setActive()
             new_glyph.restore_gsource()
         else:
-            new_glyph = ygGlyph(self.preferences, self.yg_font, gname)
-            # new line:
-            new_glyph.axis = self.preferences.top_window().current_axis
-            self.yg_glyph_scene = ygGlyphScene(self.preferences, new_glyph, owner=self)
+            scene = self._take_prefetched(gname)
+            if scene != None:
+                self.yg_glyph_scene = scene
+                new_glyph = scene.yg_glyph
+                new_glyph.axis = self.preferences.top_window().current_axis
+                new_glyph.undo_stack.setActive()
+                new_glyph.restore_gsource()
+            else:
+                new_glyph = ygGlyph(self.preferences, self.yg_font, gname)
+                # new line:
+                new_glyph.axis = self.preferences.top_window().current_axis
+                self.yg_glyph_scene = ygGlyphScene(
+                    self.preferences, new_glyph, owner=self
+                )
+            history = self.glyph_histories.pop(gname, None)
+            if history != None:
+                history.attach(new_glyph)
+        self._trim_glyph_cache()
         # For testing point sorting and grouping.
         # keyPointList(new_glyph).all_segments()
         self.preferences.set_current_glyph(self.yg_font.full_name, gname)
@@ -3175,6 +3490,185 @@ class ygGlyphView(QGraphicsView):
         new_glyph.sig_hints_changed.emit(new_glyph.hints)
         if font_viewer:
             font_viewer.set_current_glyph(new_glyph.gname, True)
+        self._schedule_prefetch()
+
+    def _trim_glyph_cache(self) -> None:
+        """Drops the scenes of the glyphs visited least recently, keeping as
+        many as preferences allow. Each glyph's undo history is kept in
+        compact form, and the scene is made again if we return to it.
+        """
+        top_window = self.preferences.top_window()
+        limit = self.preferences.glyph_cache_size()
+        while len(self.visited_glyphs) > limit:
+            gname, scene = self.visited_glyphs.popitem(last=False)  # type: ignore
+            if scene is self.yg_glyph_scene:
+                self.visited_glyphs[gname] = scene
+                break
+            g = scene.yg_glyph
+            history = ygGlyphHistory(g)
+            top_window.remove_undo_stack(g.undo_stack)
+            top_window.add_undo_stack(history.undo_stack)
+            self.glyph_histories[gname] = history
+
+    #
+    # Preparing glyphs in advance
+    #
+
+    def _prefetch_context(self) -> tuple:
+        """The display settings a scene is made with."""
+        top_window = self.preferences.top_window()
+        return (
+            top_window.show_off_curve_points,
+            top_window.show_point_numbers,
+            top_window.points_as_coords,
+        )
+
+    def _schedule_prefetch(self) -> None:
+        """Decides which glyphs to prepare while the user is busy with this
+        one: the next and previous glyphs, and those visited recently (but
+        not those whose scenes we are keeping anyway). Scenes prepared
+        earlier for other glyphs are dropped.
+        """
+        gname = self.yg_glyph_scene.yg_glyph.gname
+        if gname in self._recent_glyphs:
+            self._recent_glyphs.remove(gname)
+        self._recent_glyphs.append(gname)
+        del self._recent_glyphs[: -(PREFETCH_RECENT + 1)]
+        wanted = []
+        glyph_list = self.yg_font.glyph_list
+        current_index = self._current_index()
+        for i in [current_index + 1, current_index - 1]:
+            if i >= 0 and i < len(glyph_list):
+                wanted.append(glyph_list[i][1])
+        wanted.extend(reversed(self._recent_glyphs))
+        self._prefetch_wanted = [
+            g
+            for g in dict.fromkeys(wanted)
+            if g != gname and not g in self.visited_glyphs
+        ]
+        for g in list(self.prefetched.keys()):
+            if not g in self._prefetch_wanted:
+                self._discard_prefetched(self.prefetched.pop(g)[0])
+        self._prefetch_timer.start()
+
+    @pyqtSlot()
+    def _prefetch_next(self) -> None:
+        """Makes the glyph and scene for one of the glyphs wanted by
+        _schedule_prefetch, and checks its source in the editor pane.
+        Runs again (after a pause, so as not to hold up the user) until
+        all are made. Qt items can only be made in the GUI thread, so
+        this runs there, in the time between the user's actions.
+
+        Making a glyph changes the font's source, so this waits while a
+        build in another thread may be reading it, and cleans up the
+        glyph's program as soon as the scene is made (as when leaving a
+        glyph), so that the source is unchanged if it is saved.
+        """
+        top_window = self.preferences.top_window()
+        if top_window.source_in_use():
+            self._prefetch_timer.start()
+            return
+        current = self.yg_glyph_scene.yg_glyph.gname
+        context = self._prefetch_context()
+        for gname in self._prefetch_wanted:
+            if (
+                gname == current
+                or gname in self.visited_glyphs
+                or gname in self.prefetched
+                or not gname in self.yg_font.ft_font["glyf"]
+            ):
+                continue
+            g = None
+            scene = None
+            try:
+                g = ygGlyph(self.preferences, self.yg_font, gname, activate=False)
+                scene = ygGlyphScene(self.preferences, g, owner=self)
+                ed = top_window.source_editor
+                if ed != None:
+                    ed.check_text(g.yaml_text())
+            except Exception as e:
+                print("Can't prepare glyph " + gname + ": " + str(e))
+            if g != None:
+                # This may delete an empty program from the font's source:
+                # _take_prefetched puts it back.
+                g.cleanup_glyph()
+                if scene == None:
+                    top_window.remove_undo_stack(g.undo_stack)
+            if scene == None:
+                continue
+            self.prefetched[gname] = (scene, context)
+            self._prefetch_timer.start()
+            return
+
+    def _take_prefetched(self, gname: str) -> Optional[ygGlyphScene]:
+        """Returns the scene prepared for gname, if there is one and it
+        can still be used. The caller must restore the glyph's source
+        (ygGlyphCore.restore_gsource), which was cleaned up when the glyph
+        was made.
+        """
+        if not gname in self.prefetched:
+            return None
+        scene, context = self.prefetched.pop(gname)
+        g = scene.yg_glyph
+        glyphs = self.yg_font.glyphs
+        if context != self._prefetch_context():
+            self._discard_prefetched(scene)
+            return None
+        if not glyphs.has_glyph(gname):
+            # The empty program deleted by cleanup_glyph (or since then by
+            # ygFont.cleanup_font, when the font was saved).
+            glyphs.install_glyph_source(gname, g.gsource)
+        elif glyphs.get_glyph(gname) is not g.gsource:
+            self._discard_prefetched(scene)
+            return None
+        return scene
+
+    def _discard_prefetched(self, scene: ygGlyphScene) -> None:
+        # The glyph's program was cleaned up when it was made.
+        self.preferences.top_window().remove_undo_stack(scene.yg_glyph.undo_stack)
+
+    def glyph_cache_stats(self) -> list:
+        """For diagnostics: a list of dicts describing the glyphs kept for
+        returning to, scenes (least recently visited first) and then
+        compact histories, and the scenes prepared in advance. undo_bytes
+        is an estimate.
+        """
+        result = []
+        for gname, scene in self.visited_glyphs.items():
+            undo_stack = scene.yg_glyph.undo_stack
+            result.append(
+                {
+                    "glyph": gname,
+                    "kind": "scene",
+                    "items": len(scene.items()),
+                    "hints": len(scene.yg_hint_view_list),
+                    "undo_commands": undo_stack.count(),
+                    "undo_bytes": undo_stack_size(undo_stack),
+                }
+            )
+        for gname, history in self.glyph_histories.items():
+            result.append(
+                {
+                    "glyph": gname,
+                    "kind": "history",
+                    "items": 0,
+                    "hints": 0,
+                    "undo_commands": history.undo_stack.count(),
+                    "undo_bytes": history.size(),
+                }
+            )
+        for gname, (scene, context) in self.prefetched.items():
+            result.append(
+                {
+                    "glyph": gname,
+                    "kind": "prefetched",
+                    "items": len(scene.items()),
+                    "hints": len(scene.yg_hint_view_list),
+                    "undo_commands": 0,
+                    "undo_bytes": 0,
+                }
+            )
+        return result
 
     @pyqtSlot()
     def guess_cv(self) -> None:
@@ -3273,6 +3767,9 @@ class ygGlyphView(QGraphicsView):
                 gg = g.keys()
                 for ggg in gg:
                     print(str(ggg) + ": " + str(sys.getsizeof(g[ggg])))
+                print("========= glyph cache =========")
+                for st in self.glyph_cache_stats():
+                    print(", ".join(str(k) + ": " + str(v) for k, v in st.items()))
         elif event.key() == Qt.Key.Key_Minus:
             self.yg_glyph_scene.delete_from_set()
         elif event.key() == 32 and not event.isAutoRepeat():
@@ -10,6 +10,8 @@ import os
 from yaml import Loader, Dumper
 
 RECENTS_LIST_LENGTH = 10
+# How many edited glyphs the editor keeps ready to return to.
+GLYPH_CACHE_SIZE = 24
 
 
 class ygPreferences(dict):
@@ -32,6 +34,7 @@ class ygPreferences(dict):
         self["top_window_height"] = None
         self["top_window_width"] = None
         self["show_named_sets"] = True
+        self["glyph_cache_size"] = GLYPH_CACHE_SIZE
 
     def set_set_view(self, b: bool) -> None:
         self["show_named_sets"] = b
@@ -75,6 +78,15 @@ class ygPreferences(dict):
     def set_auto_preview(self, p: bool) -> None:
         self["auto_preview"] = p
 
+    def glyph_cache_size(self) -> int:
+        try:
+            return max(1, int(self["glyph_cache_size"]))
+        except Exception:
+            return GLYPH_CACHE_SIZE
+
+    def set_glyph_cache_size(self, n: int) -> None:
+        self["glyph_cache_size"] = int(n)
+
     def zoom_factor(self) -> float:
         return self["zoom_factor"]
 
@@ -1,6 +1,5 @@
-from typing import Callable, List, Optional
-import copy
-from numpy import nditer
+from typing import Callable, Optional
+from numpy import ndarray, ascontiguousarray, repeat, zeros, uint8
 from .freetypeFont import (
     freetypeFont,
     RENDER_GRAYSCALE,
@@ -19,7 +18,15 @@ from PyQt6.QtWidgets import (
     QScrollArea,
     QSizePolicy,
 )
-from PyQt6.QtGui import QPainter, QBrush, QColor, QPalette, QPixmap, QGuiApplication
+from PyQt6.QtGui import (
+    QPainter,
+    QBrush,
+    QColor,
+    QPalette,
+    QPixmap,
+    QImage,
+    QGuiApplication,
+)
 from PyQt6.QtCore import Qt, QRect, pyqtSignal, pyqtSlot, QLine
 
 # import cv2
@@ -69,6 +76,8 @@ class ygPreview(QLabel):
 
         self.max_pixel_size = 12
         self.pixel_size = 12
+        # Width of the FreeType bitmap (three times the width in pixels for LCD).
+        self.bitmap_width = 0
         # absolute height of the glyph, from top pixel to bottom pixel.
         self.current_glyph_height = 0
         # Corresponds to font's ascender number
@@ -102,7 +111,6 @@ class ygPreview(QLabel):
             QGuiApplication.styleHints().colorScheme() == Qt.ColorScheme.Dark
         )
         self.theme_choice = "auto"
-        self.colors = None
         self.change_theme(self.theme_choice)
 
         self.render_mode = RENDER_LCD_1
@@ -135,22 +143,6 @@ class ygPreview(QLabel):
                 palette.setColor(QPalette.ColorRole.Base, self.default_background)
                 self.setPalette(palette)
         self.background_color = self.palette().color(QPalette.ColorRole.Base)
-        self.colors = self.mk_color_list()
-
-    def mk_color_list(self) -> List[QColor]:
-        """Pre-build a list of grayscale colors--for the big preview."""
-        l = [0] * 256
-
-        dark_theme = self.theme_choice == "dark"
-        if self.theme_choice == "auto":
-            dark_theme = self.dark_theme
-
-        for count, c in enumerate(l):
-            if dark_theme:
-                l[count] = QColor(255, 255, 255, count)  # type: ignore
-            else:
-                l[count] = QColor(0, 0, 0, count)  # type: ignore
-        return l  # type: ignore
 
     def fetch_glyph(self, font, glyph_index):
         """Get a temporary FreeType font, then build the specified glyph.
@@ -163,7 +155,12 @@ class ygPreview(QLabel):
 
         """
         self.glyph_index = glyph_index
-        self.face = freetypeFont(font)
+        # Glyphs cached for the old font are no good for the new one, but
+        # keep the cache's counters.
+        bitmap_cache = None
+        if self.face != None:
+            bitmap_cache = self.face.bitmap_cache
+        self.face = freetypeFont(font, bitmap_cache=bitmap_cache)
         self._build_glyph()
 
     def _build_glyph(self) -> bool:
@@ -177,11 +174,11 @@ class ygPreview(QLabel):
         self.face.set_char(self.glyph_index)
         gdata = self.face._get_bitmap_metrics()
 
-        ft_bitmap = self.face.glyph_slot.bitmap
-        ft_width = ft_bitmap.width
-        ft_rows = ft_bitmap.rows
+        ft_width = gdata["width"]
+        ft_rows = gdata["rows"]
+        self.bitmap_width = ft_width
         self.current_glyph_height = ft_rows
-        self.bitmap_top = self.face.glyph_slot.bitmap_top
+        self.bitmap_top = gdata["bitmap_top"]
         self.grid_height = self.face.ascender + abs(self.face.descender)
         self.total_height = self.grid_height
         top_offset = self.face.ascender - self.bitmap_top
@@ -216,7 +213,7 @@ class ygPreview(QLabel):
         else:
             if self.pixel_size < 1:
                 self.pixel_size = 1
-        self.Z = self.face.mk_array(gdata, self.render_mode)
+        self.Z = self.face.bitmap
         return True
 
     @pyqtSlot()
@@ -387,7 +384,7 @@ class ygPreview(QLabel):
 
         pen = painter.pen()
         pen.setWidth(1)
-        line_length = self.face.glyph_slot.bitmap.width * self.pixel_size
+        line_length = self.bitmap_width * self.pixel_size
         if not self.render_mode in [RENDER_GRAYSCALE, RENDER_MONO]:
             line_length = int(line_length / 3)
 
@@ -408,7 +405,7 @@ class ygPreview(QLabel):
             top += self.pixel_size
 
         if self.render_mode in [RENDER_GRAYSCALE, RENDER_LCD_1, RENDER_MONO]:
-            grid_width = self.face.glyph_slot.bitmap.width + 1
+            grid_width = self.bitmap_width + 1
             if self.render_mode == RENDER_LCD_1:
                 grid_width = round(grid_width / 3) + 1
             y_top = self.vertical_margin + (self.top_grid_offset * self.pixel_size)
@@ -423,185 +420,105 @@ class ygPreview(QLabel):
                 painter.drawLine(QLine(left, y_top, left, y_bot))
                 left += self.pixel_size
 
-    def make_pixmap_mono(self) -> None:
-        """Paint monochrome glyph."""
-        dark_theme = self.theme_choice == "dark"
+    def _is_dark_theme(self) -> bool:
         if self.theme_choice == "auto":
-            dark_theme = self.dark_theme
+            return self.dark_theme
+        return self.theme_choice == "dark"
 
+    def _start_pixmap(self) -> Optional[QPainter]:
+        """Clear the pixmap and build the glyph. Returns a QPainter for the
+        pixmap, or None if there is nothing to draw.
+        """
         if self.pixmap == None:
             self.pixmap = QPixmap(self.width(), self.height())
         self.pixmap.fill(self.background_color)
         painter = QPainter(self.pixmap)
-
-        if not self._build_glyph():
+        if not self._build_glyph() or len(self.Z) == 0:
             painter.end()
-            return
-        if len(self.Z) == 0:
-            painter.end()
-            return
+            return None
+        return painter
 
-        xposition = self.horizontal_margin
-        yposition = self.vertical_margin + (self.top_char_margin * self.pixel_size)
-
-        ft_width = self.face.glyph_slot.bitmap.width
-        ft_rows = self.face.glyph_slot.bitmap.rows
-
-        pixcolor = QColor("white") if dark_theme else QColor("black")
-        bytestepper = 0
-        for r in range(ft_rows):
-            for w in range(ft_width):
-                if self.Z[bytestepper]:
-                    qr = QRect(xposition, yposition, self.pixel_size, self.pixel_size)
-                    painter.fillRect(qr, pixcolor)
-                xposition += self.pixel_size
-                bytestepper += 1
-            yposition += self.pixel_size
-            xposition = self.horizontal_margin
+    def _finish_pixmap(self, painter: QPainter) -> None:
         if self.show_grid:
             self.draw_grid(painter)
         painter.end()
         self.setPixmap(self.pixmap)
-
         self.sig_preview_paint_done.emit(None)
 
-    def make_pixmap_grayscale(self) -> None:
-        """Paint grayscale glyph."""
-        dark_theme = self.theme_choice == "dark"
-        if self.theme_choice == "auto":
-            dark_theme = self.dark_theme
-
-        if self.pixmap == None:
-            self.pixmap = QPixmap(self.width(), self.height())
-        self.pixmap.fill(self.background_color)
-        painter = QPainter(self.pixmap)
-
-        if not self._build_glyph():
-            painter.end()
-            return
-        if len(self.Z) == 0:
-            painter.end()
+    def _draw_rgba(
+        self, painter: QPainter, rgba: ndarray, cell_width: int, cell_height: int
+    ) -> None:
+        """Magnify an array of RGBA pixels (rows x columns x 4), making each
+        pixel a cell_width x cell_height rectangle, and draw it in one go at
+        the top left of the glyph.
+        """
+        if rgba.size == 0:
             return
+        big = repeat(repeat(rgba, cell_height, axis=0), cell_width, axis=1)
+        big = ascontiguousarray(big, dtype=uint8)
+        height, width = big.shape[0], big.shape[1]
+        img = QImage(big.data, width, height, width * 4, QImage.Format.Format_RGBA8888)
         xposition = self.horizontal_margin
         yposition = self.vertical_margin + (self.top_char_margin * self.pixel_size)
-        for row in self.Z:
-            for col in row:
-                qr = QRect(xposition, yposition, self.pixel_size, self.pixel_size)
-                painter.fillRect(qr, self.colors[col])
-                xposition += self.pixel_size
-            yposition += self.pixel_size
-            xposition = self.horizontal_margin
-        if self.show_grid:
-            self.draw_grid(painter)
-        painter.end()
-        self.setPixmap(self.pixmap)
-        self.sig_preview_paint_done.emit(None)
-
-    def make_pixmap_lcd1(self) -> None:
-        """Make glyph rendered as subpixel 1"""
-        dark_theme = self.theme_choice == "dark"
-        if self.theme_choice == "auto":
-            dark_theme = self.dark_theme
-
-        if self.pixmap == None:
-            self.pixmap = QPixmap(self.width(), self.height())
-        self.pixmap.fill(self.background_color)
-        painter = QPainter(self.pixmap)
+        painter.drawImage(xposition, yposition, img)
 
-        if not self._build_glyph():
-            painter.end()
-            return
-        if len(self.Z) == 0:
-            painter.end()
+    def make_pixmap_mono(self) -> None:
+        """Paint monochrome glyph."""
+        painter = self._start_pixmap()
+        if painter == None:
             return
-        # Get a copy of the pre-corrected bitmap to use as a mask. We'll skip drawing any
-        # pixels with color 0,0,0.
-        mask = copy.deepcopy(self.Z)
-
-        xposition = self.horizontal_margin
-        yposition = self.vertical_margin + (self.top_char_margin * self.pixel_size)
-
-        for i, row in enumerate(self.Z):
-            for ii, col in enumerate(row):
-                # If any of the (rgb) bytes for this pixel are non-zero in the mask,
-                # draw the pixel. Otherwise skip.
-                if mask[i][ii].any():
-                    rgb = []
-                    for elem in col:
-                        rgb.append(elem)
-                    if dark_theme:
-                        qc = QColor(rgb[0], rgb[1], rgb[2])
-                    else:
-                        qc = QColor(255 - rgb[0], 255 - rgb[1], 255 - rgb[2])
-                    qr = QRect(xposition, yposition, self.pixel_size, self.pixel_size)
-                    painter.fillRect(qr, qc)
-                xposition += self.pixel_size
-            yposition += self.pixel_size
-            xposition = self.horizontal_margin
-
-        if self.show_grid:
-            self.draw_grid(painter)
-
-        painter.end()
-
-        self.setPixmap(self.pixmap)
+        bits = self.Z.astype(bool)
+        # Set pixels are opaque white or black; the rest are transparent.
+        rgba = zeros(self.Z.shape + (4,), dtype=uint8)
+        if self._is_dark_theme():
+            rgba[bits] = (255, 255, 255, 255)
+        else:
+            rgba[bits] = (0, 0, 0, 255)
+        self._draw_rgba(painter, rgba, self.pixel_size, self.pixel_size)
+        self._finish_pixmap(painter)
 
-        self.sig_preview_paint_done.emit(None)
+    def make_pixmap_grayscale(self) -> None:
+        """Paint grayscale glyph."""
+        painter = self._start_pixmap()
+        if painter == None:
+            return
+        # The gray level of each pixel becomes the alpha of the text color.
+        rgba = zeros(self.Z.shape + (4,), dtype=uint8)
+        if self._is_dark_theme():
+            rgba[..., :3] = 255
+        rgba[..., 3] = self.Z
+        self._draw_rgba(painter, rgba, self.pixel_size, self.pixel_size)
+        self._finish_pixmap(painter)
 
-    def make_pixmap_lcd2(self) -> None:
+    def make_pixmap_lcd1(self) -> None:
         """Make glyph rendered as subpixel 1"""
-        dark_theme = self.theme_choice == "dark"
-        if self.theme_choice == "auto":
-            dark_theme = self.dark_theme
-
-        if self.pixmap == None:
-            self.pixmap = QPixmap(self.width(), self.height())
-        self.pixmap.fill(self.background_color)
-        painter = QPainter(self.pixmap)
-
-        if not self._build_glyph():
-            painter.end()
+        painter = self._start_pixmap()
+        if painter == None:
             return
-        if len(self.Z) == 0:
-            painter.end()
+        rgb = self.Z if self._is_dark_theme() else 255 - self.Z
+        rgba = zeros(self.Z.shape[:2] + (4,), dtype=uint8)
+        rgba[..., :3] = rgb
+        # Skip (leave transparent) any pixel whose subpixels are all zero.
+        rgba[..., 3] = self.Z.any(axis=2) * 255
+        self._draw_rgba(painter, rgba, self.pixel_size, self.pixel_size)
+        self._finish_pixmap(painter)
+
+    def make_pixmap_lcd2(self) -> None:
+        """Make glyph rendered as subpixel 2"""
+        painter = self._start_pixmap()
+        if painter == None:
             return
-        xposition = self.horizontal_margin
-        yposition = self.vertical_margin + (self.top_char_margin * self.pixel_size)
-        dark_theme = self.theme_choice == "dark"
-        if self.theme_choice == "auto":
-            dark_theme = self.dark_theme
-        for row in self.Z:
-            for col in row:
-                for n, elem in enumerate(col):
-                    if dark_theme:
-                        if n == 0:
-                            qc = QColor(elem, 0, 0)
-                        elif n == 1:
-                            qc = QColor(0, elem, 0)
-                        elif n == 2:
-                            qc = QColor(0, 0, elem)
-                    else:
-                        if n == 0:
-                            qc = QColor(255 - elem, 0, 0)
-                        elif n == 1:
-                            qc = QColor(0, 255 - elem, 0)
-                        elif n == 2:
-                            qc = QColor(0, 0, 255 - elem)
-                    qr = QRect(
-                        int(xposition),
-                        int(yposition),
-                        int(self.pixel_size / 3),
-                        int(self.pixel_size),
-                    )
-                    painter.fillRect(qr, qc)
-                    xposition += int(self.pixel_size / 3)
-            yposition += self.pixel_size
-            xposition = self.horizontal_margin
-        if self.show_grid:
-            self.draw_grid(painter)
-        painter.end()
-        self.setPixmap(self.pixmap)
-        self.sig_preview_paint_done.emit(None)
+        rgb = self.Z if self._is_dark_theme() else 255 - self.Z
+        rows, cols = self.Z.shape[0], self.Z.shape[1]
+        # Each pixel becomes three opaque subpixels side by side, each in
+        # its own primary color: (r, 0, 0), (0, g, 0), (0, 0, b).
+        rgba = zeros((rows, cols, 3, 4), dtype=uint8)
+        for n in range(3):
+            rgba[:, :, n, n] = rgb[:, :, n]
+        rgba[..., 3] = 255
+        rgba = rgba.reshape(rows, cols * 3, 4)
+        self._draw_rgba(painter, rgba, int(self.pixel_size / 3), self.pixel_size)
+        self._finish_pixmap(painter)
 
 
 class ygStringPreviewPanel(ygLabel):
@@ -0,0 +1,189 @@
+"""Building preview fonts in the background, for the preview pane and the
+hinted font view.
+"""
+
+from typing import Optional
+import time
+from xgridfit import compile_list  # type: ignore
+from PyQt6.QtCore import QThread, QTimer, QObject, pyqtSignal, pyqtSlot
+from .ygCompiler import ygProgramCache, compileCancelled
+from .fontBuffer import fontBuffer
+
+
+class ygPreviewFontMaker(QThread):
+    """To be run from a QThread. This is because it can take the better
+    part of a second to generate a preview, even on a pretty fast
+    machine, and we want to be able to run this on a signal without
+    making the GUI balky.
+
+    Parameters:
+
+    font: a fontBuffer holding the unhinted font
+
+    source: the source for this font's hints
+
+    glyph_list: the names of the glyphs for which we want to make the preview.
+
+    cache: a ygProgramCache. If present, only glyphs whose programs aren't
+    already in the cache are compiled.
+
+    program_list: if present (and there is a cache), only these glyphs get
+    programs (see ygProgramCache.compile_list).
+    """
+
+    sig_preview_ready = pyqtSignal(object)
+    sig_preview_error = pyqtSignal()
+
+    def __init__(
+        self,
+        font: fontBuffer,
+        source: dict,
+        glyph_list: list,
+        cache: Optional[ygProgramCache] = None,
+        program_list: Optional[list] = None,
+    ) -> None:
+        super().__init__()
+        self.ft_font = font
+        self.source = source
+        self.cache = cache
+        self.program_list = program_list
+        self.glyph_list = []
+        for g in glyph_list:
+            try:
+                self.glyph_list.append(g.decode(encoding="utf-8"))
+            except Exception:
+                self.glyph_list.append(g)
+        self.error = False
+
+    def run(self) -> None:
+        try:
+            if self.cache != None:
+                tmp_font, glyph_index, failed_glyph_list = self.cache.compile_list(
+                    self.ft_font,
+                    self.source,
+                    self.glyph_list,
+                    cancelled=self.isInterruptionRequested,
+                    program_list=self.program_list,
+                )
+            else:
+                font = self.ft_font.copy()
+                tmp_font, glyph_index, failed_glyph_list = compile_list(
+                    font, self.source, self.glyph_list
+                )
+            self.sig_preview_ready.emit(
+                {"font": tmp_font, "gindex": glyph_index, "failed": failed_glyph_list}
+            )
+        except compileCancelled:
+            pass
+        except Exception as e:
+            self.sig_preview_error.emit()
+
+
+class ygPreviewScheduler(QObject):
+    """Decides when to build previews.
+
+    Requests that arrive in a burst (as when the user is making a series
+    of quick edits) are coalesced: nothing is built until the requests
+    stop for delay ms, or until the oldest unserved request has waited
+    max_wait ms. At most one build runs at a time, and at most one request
+    waits behind it; a new request replaces the waiting one. If the new
+    request is for a different set of glyphs from the running build (e.g.
+    the user has moved to another glyph), the running build is asked to
+    stop, since its result would be of no use.
+
+    The dict sent with sig_preview_ready is the one produced by
+    ygPreviewFontMaker, plus "build_time" (the time spent in the build
+    thread) and "latency" (time from the first request served by this
+    build until now), both in seconds.
+    """
+
+    sig_preview_ready = pyqtSignal(object)
+    sig_preview_error = pyqtSignal()
+
+    def __init__(self, delay: int = 100, max_wait: int = 400, parent=None) -> None:
+        super().__init__(parent=parent)
+        self.delay = delay
+        self.max_wait = max_wait
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._start_pending)
+        self.pending: Optional[dict] = None
+        self.in_flight: Optional[dict] = None
+        self.builder: Optional[ygPreviewFontMaker] = None
+
+    def is_busy(self) -> bool:
+        return self.in_flight != None
+
+    def request(
+        self,
+        font: fontBuffer,
+        source: dict,
+        glyph_list: list,
+        cache: Optional[ygProgramCache] = None,
+        program_list: Optional[list] = None,
+    ) -> None:
+        now = time.perf_counter()
+        if self.pending != None:
+            requested = self.pending["requested"]
+        else:
+            requested = now
+        self.pending = {
+            "font": font,
+            "source": source,
+            "glyph_list": list(glyph_list),
+            "cache": cache,
+            "program_list": program_list,
+            "requested": requested,
+        }
+        if (
+            self.in_flight != None
+            and self.builder != None
+            and set(self.in_flight["glyph_list"]) != set(glyph_list)
+        ):
+            self.builder.requestInterruption()
+        waited = round((now - requested) * 1000)
+        self.timer.start(max(0, min(self.delay, self.max_wait - waited)))
+
+    def cancel(self) -> None:
+        """Drops any waiting request and asks the running build to stop."""
+        self.timer.stop()
+        self.pending = None
+        if self.builder != None:
+            self.builder.requestInterruption()
+
+    @pyqtSlot()
+    def _start_pending(self) -> None:
+        if self.pending == None or self.is_busy():
+            # If busy, we'll be called again when the current build finishes.
+            return
+        self.in_flight = self.pending
+        self.pending = None
+        self.in_flight["started"] = time.perf_counter()
+        self.builder = ygPreviewFontMaker(
+            self.in_flight["font"],
+            self.in_flight["source"],
+            self.in_flight["glyph_list"],
+            cache=self.in_flight["cache"],
+            program_list=self.in_flight["program_list"],
+        )
+        self.builder.sig_preview_ready.connect(self._build_ready)
+        self.builder.sig_preview_error.connect(self.sig_preview_error)
+        self.builder.finished.connect(self._build_finished)
+        self.builder.finished.connect(self.builder.deleteLater)
+        self.builder.start()
+
+    @pyqtSlot(object)
+    def _build_ready(self, args: dict) -> None:
+        if self.in_flight == None:
+            return
+        now = time.perf_counter()
+        args["build_time"] = now - self.in_flight["started"]
+        args["latency"] = now - self.in_flight["requested"]
+        self.sig_preview_ready.emit(args)
+
+    @pyqtSlot()
+    def _build_finished(self) -> None:
+        self.in_flight = None
+        self.builder = None
+        if self.pending != None and not self.timer.isActive():
+            self._start_pending()
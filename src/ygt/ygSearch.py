@@ -0,0 +1,188 @@
+"""A search index over the glyphs of a font, for the font view's filter and
+the Find Glyph dialog.
+
+A query is a list of terms separated by spaces, all of which a glyph must
+match:
+
+    acute               glyph name contains "acute"
+    U+00E9, u:e9        glyph is mapped to this code point (hex)
+    cat:Lu              Unicode category (or a glyph's "category" property);
+                        a single letter (cat:L) matches the whole class
+    hinted:yes/no       glyph has (or lacks) hints
+    composite:yes/no    glyph is (or isn't) a composite
+    comp:acutecomb      glyph uses this component (component:, too)
+
+This module does not import PyQt6.
+"""
+
+from typing import Optional
+from bisect import bisect_right
+import re
+
+SEARCH_FIELDS = ["cat", "hinted", "composite", "comp", "component", "u"]
+
+_yes = ["yes", "y", "true", "1"]
+_no = ["no", "n", "false", "0"]
+
+
+class ygGlyphIndex:
+    """Indexes for searching the glyphs in a font's glyph_list (see
+    ygFontCore). Results come back as entries of glyph_list ((unicode,
+    name) tuples), in glyph_list order.
+
+    Names are kept in one newline-separated string, so a substring search
+    is a single pass of the regex engine, plus a bisect per hit to find the
+    glyph it is in. Everything else is a dict or set lookup. The "hinted"
+    set and the categories (which a glyph's properties can override) change
+    as the user works: call glyph_changed(), and the glyph is looked at
+    again before the next search.
+    """
+
+    def __init__(self, yg_font) -> None:
+        self.yg_font = yg_font
+        self.glyph_list = yg_font.glyph_list
+        self.names = [g[1] for g in self.glyph_list]
+        self.positions = {n: i for i, n in enumerate(self.names)}
+        self.name_text = "\n".join(self.names)
+        # Offset in name_text where each name starts.
+        self.offsets = []
+        o = 0
+        for n in self.names:
+            self.offsets.append(o)
+            o += len(n) + 1
+
+        cmap = yg_font.cmap
+        glyf = yg_font.ft_font["glyf"]
+        self.by_codepoint: dict = {}
+        self.composites: set = set()
+        self.by_component: dict = {}
+        for i, n in enumerate(self.names):
+            u = cmap.get(n)
+            if u != None:
+                for uu in u if type(u) is set else [u]:
+                    self.by_codepoint.setdefault(uu, set()).add(i)
+            g = glyf.glyphs[n]
+            if g.isComposite():
+                self.composites.add(i)
+                for c in g.getComponentNames(glyf):
+                    self.by_component.setdefault(c, set()).add(i)
+
+        self.category: dict = {}
+        self.by_category: dict = {}
+        self.hinted: set = set()
+        self.stale: set = set()
+        for i, n in enumerate(self.names):
+            self._index_glyph(i, n)
+
+    def _glyph_category(self, gname: str) -> str:
+        try:
+            cat = self.yg_font.source["glyphs"][gname]["props"]["category"]
+            if cat:
+                return cat
+        except (KeyError, TypeError):
+            pass
+        return self.yg_font.get_unicode_category(gname)
+
+    def _index_glyph(self, i: int, gname: str) -> None:
+        cat = self._glyph_category(gname)
+        old_cat = self.category.get(i)
+        if old_cat != cat:
+            if old_cat != None:
+                self.by_category[old_cat].discard(i)
+            self.category[i] = cat
+            self.by_category.setdefault(cat, set()).add(i)
+        if self.yg_font.has_hints(gname):
+            self.hinted.add(i)
+        else:
+            self.hinted.discard(i)
+
+    def glyph_changed(self, gname: str) -> None:
+        """Marks a glyph whose hints or properties may have changed."""
+        self.stale.add(gname)
+
+    def _refresh(self) -> None:
+        for gname in self.stale:
+            i = self.positions.get(gname)
+            if i != None:
+                self._index_glyph(i, gname)
+        self.stale.clear()
+
+    def _name_matches(self, s: str) -> set:
+        result = set()
+        for m in re.finditer(re.escape(s), self.name_text):
+            result.add(bisect_right(self.offsets, m.start()) - 1)
+        return result
+
+    def _category_matches(self, c: str) -> set:
+        if len(c) == 1:
+            result: set = set()
+            for k, v in self.by_category.items():
+                if k.startswith(c.upper()):
+                    result |= v
+            return result
+        for k, v in self.by_category.items():
+            if k.lower() == c.lower():
+                return v
+        return set()
+
+    def _codepoint_matches(self, h: str) -> Optional[set]:
+        try:
+            return self.by_codepoint.get(int(h, 16), set())
+        except ValueError:
+            return None
+
+    def _term_matches(self, term: str) -> set:
+        key, sep, val = term.partition(":")
+        key = key.lower()
+        if sep and key in SEARCH_FIELDS:
+            all_glyphs = set(range(len(self.names)))
+            if key == "cat":
+                return self._category_matches(val)
+            if key == "hinted":
+                if val.lower() in _no:
+                    return all_glyphs - self.hinted
+                return self.hinted
+            if key == "composite":
+                if val.lower() in _no:
+                    return all_glyphs - self.composites
+                return self.composites
+            if key in ["comp", "component"]:
+                return self.by_component.get(val, set())
+            if key == "u":
+                r = self._codepoint_matches(val)
+                if r != None:
+                    return r
+        if term[:2].upper() == "U+":
+            r = self._codepoint_matches(term[2:])
+            if r != None:
+                return r
+        return self._name_matches(term)
+
+    def search_indices(self, query: str) -> list:
+        """Returns the positions in glyph_list of the glyphs matching
+        query, in order.
+        """
+        self._refresh()
+        terms = query.split()
+        if len(terms) == 0:
+            return list(range(len(self.names)))
+        sets = sorted((self._term_matches(t) for t in terms), key=len)
+        result = set(sets[0])
+        for s in sets[1:]:
+            if len(result) == 0:
+                break
+            result &= s
+        return sorted(result)
+
+    def search(self, query: str) -> list:
+        """Returns the entries of glyph_list matching query."""
+        return [self.glyph_list[i] for i in self.search_indices(query)]
+
+    def search_names(self, query: str, limit: Optional[int] = None) -> list:
+        """Returns the names of the glyphs matching query (no more than
+        limit of them, if given).
+        """
+        ii = self.search_indices(query)
+        if limit != None:
+            ii = ii[:limit]
+        return [self.names[i] for i in ii]
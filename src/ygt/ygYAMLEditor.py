@@ -6,6 +6,7 @@ import yaml
 import re
 from yaml import Dumper
 import copy
+from collections import OrderedDict
 from schema import SchemaError  # type: ignore
 from .ygSchema import is_valid, set_error_message, error_message, have_error_message
 from .ygModel import ygSourceable
@@ -27,6 +28,9 @@ yaml.add_representer(str, str_presenter)
 # to use with safe_dump:
 yaml.representer.SafeRepresenter.add_representer(str, str_presenter)
 
+# How many texts ygYAMLEditor remembers as valid.
+VALID_TEXTS_KEPT = 32
+
 
 class ygYAMLEditor(QPlainTextEdit):
     """An editor for source code for the current axis of the current glyph.
@@ -52,6 +56,8 @@ class ygYAMLEditor(QPlainTextEdit):
         self._timer = QTimer()
         self._timer.timeout.connect(self.check_valid)
         self.code_valid = True
+        # Texts known to be valid, most recently checked last (see check_text).
+        self._valid_texts: OrderedDict = OrderedDict()
         self.setup_editor()
 
     def setup_error_signal(self, f: Callable) -> None:
@@ -103,6 +109,26 @@ class ygYAMLEditor(QPlainTextEdit):
             self.sig_error.emit({"msg": error_message(), "mode": "console"})
             self.sig_status.emit(self.code_valid)
 
+    def check_text(self, text: str) -> bool:
+        """Parses and validates source for a glyph block. Texts found to be
+        valid are remembered, since the same source is installed every time
+        we return to a glyph (and ygGlyphView checks the source of glyphs it
+        prepares in advance).
+        """
+        if text in self._valid_texts:
+            self._valid_texts.move_to_end(text)
+            return True
+        try:
+            y = yaml.safe_load(text)
+        except Exception as e:
+            return False
+        if not is_valid({"points": y}):
+            return False
+        self._valid_texts[text] = True
+        if len(self._valid_texts) > VALID_TEXTS_KEPT:
+            self._valid_texts.popitem(last=False)
+        return True
+
     @pyqtSlot()
     def text_changed(self) -> None:
         self.code_valid = True
@@ -110,12 +136,7 @@ class ygYAMLEditor(QPlainTextEdit):
         if len(y) == 0:
             self.setPlainText("[]\n")
         else:
-            try:
-                y = yaml.safe_load(y)
-            except Exception as e:
-                self.code_valid = False
-            if self.code_valid:
-                self.code_valid = is_valid({"points": y})
+            self.code_valid = self.check_text(y)
         # If code is not valid, start timer. Any time user presses a key,
         # the timer will restart if code is not (yet) valid. The effect is
         # that user has two seconds after any keypress to achieve validity